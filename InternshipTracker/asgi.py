@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'InternshipTracker.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'True')
+# Each ASGI request runs its ORM calls on a fresh thread, so persistent
+# connections would never be reused.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "Main.middleware.RequestMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -52,6 +53,17 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-view request metrics, shown to staff at /internship-tracker/metrics/.
+# When disabled the middleware unloads itself at startup.
+METRICS_ENABLED = config("METRICS_ENABLED", default=False, cast=bool)
+METRICS_QUERY_BUDGET = config("METRICS_QUERY_BUDGET", default=15, cast=int)
+METRICS_REPEAT_THRESHOLD = config("METRICS_REPEAT_THRESHOLD", default=5, cast=int)
+
+# Serve the dashboard, quick log and daily record views as async views.
+# asgi.py turns this on; under WSGI the sync views are kept, since async
+# views there would each run in their own event loop.
+ASYNC_VIEWS = config("DJANGO_ASYNC_VIEWS", default=False, cast=bool)
+
 ROOT_URLCONF = "InternshipTracker.urls"
 
 TEMPLATES = [
@@ -75,13 +87,114 @@ WSGI_APPLICATION = "InternshipTracker.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# DB_PROFILE=production (the default) tunes SQLite for many concurrent
+# quick-log writers: WAL so readers never block the writer, a busy timeout so
+# writers queue instead of failing with "database is locked", IMMEDIATE
+# transactions so a read-then-write never deadlocks on lock upgrade, and
+# persistent connections so the pragmas are not re-run on every request.
+# DB_PROFILE=basic keeps SQLite's stock behaviour.
+
+DB_PROFILE = config("DB_PROFILE", default="production")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "internship-tracker-db.sqlite3",
+        # A file rather than SQLite's shared in-memory database, so threaded
+        # tests get separate connections and locking like the workers do.
+        "TEST": {"NAME": BASE_DIR / "test-internship-tracker-db.sqlite3"},
     }
 }
 
+if DB_PROFILE == "production":
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "busy_timeout": config("SQLITE_BUSY_TIMEOUT_MS", default=20000, cast=int),
+        "synchronous": config("SQLITE_SYNCHRONOUS", default="NORMAL"),
+        "mmap_size": config("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024, cast=int),
+        # Negative values are KiB rather than pages.
+        "cache_size": config("SQLITE_CACHE_SIZE", default=-32000, cast=int),
+        "temp_store": "MEMORY",
+    }
+    DATABASES["default"].update(
+        {
+            "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=600, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+                "transaction_mode": "IMMEDIATE",
+                "init_command": ";".join(
+                    f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+                ),
+            },
+        }
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Defaults to per-process local memory; point DJANGO_CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache and DJANGO_CACHE_LOCATION
+# at a directory to share cached dashboard stats between workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "DJANGO_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("DJANGO_CACHE_LOCATION", default="internship-tracker"),
+    }
+}
+
+STATS_CACHE_TIMEOUT = config("STATS_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+
+# Rendered dashboard fragments (month calendar, stats block). Their keys
+# change with the data, so this only bounds how long unused ones linger.
+FRAGMENT_CACHE_TIMEOUT = config("FRAGMENT_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+
+# Delta sync (the sync/ endpoint). Cursors trail the clock by this many
+# seconds so a write still committing when a client polls is sent on the
+# next poll; it should exceed the longest write transaction.
+SYNC_CURSOR_LAG_SECONDS = config("SYNC_CURSOR_LAG_SECONDS", default=5, cast=int)
+# How long deletions are remembered; clients with an older cursor get a
+# full sync.
+SYNC_TOMBSTONE_DAYS = config("SYNC_TOMBSTONE_DAYS", default=30, cast=int)
+
+# How long queued quick-log punches (the punches/ endpoint) are kept to
+# spot replays. Older punches are refused, so a replay can't outlive them.
+PUNCH_RETENTION_DAYS = config("PUNCH_RETENTION_DAYS", default=30, cast=int)
+
+# How often each process checks whether the shared Holiday table changed.
+HOLIDAY_CALENDAR_CHECK_SECONDS = config(
+    "HOLIDAY_CALENDAR_CHECK_SECONDS", default=30, cast=int
+)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/6.0/topics/http/sessions/#configuring-the-session-engine
+# The default database sessions cost a query per request. cached_db
+# ("django.contrib.sessions.backends.cached_db") serves them from the cache
+# above, so give it a cache shared by every worker; signed cookies
+# ("django.contrib.sessions.backends.signed_cookies") keep them in the
+# browser and need no lookup at all, but the client can read their contents.
+# Changing the engine signs everyone out.
+
+SESSION_ENGINE = config(
+    "DJANGO_SESSION_ENGINE", default="django.contrib.sessions.backends.db"
+)
+
+
+# Authentication
+# InternshipBackend loads the intern's Internship in the same query as the
+# session user. ModelBackend stays listed so sessions signed in before it
+# keep working until they next sign in.
+
+AUTHENTICATION_BACKENDS = [
+    "Main.backends.InternshipBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -1,5 +1,34 @@
+from collections import defaultdict
+
 from django.contrib import admin
-from .models import Internship, DailyTimeRecord
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from .models import (
+    DailyTimeRecord,
+    Holiday,
+    Internship,
+    record_tombstones,
+    refresh_rollups,
+)
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Counts at most `count_limit` rows, so paging through a large unfiltered
+    table doesn't COUNT(*) it on every request. Past the cap the page links
+    simply stop.
+    """
+
+    count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        return self.object_list[: self.count_limit].count()
 
 
 class DailyTimeRecordInline(admin.TabularInline):  # or StackedInline
@@ -17,6 +46,21 @@ class DailyTimeRecordInline(admin.TabularInline):  # or StackedInline
         "is_absent",
     )
     readonly_fields = ("total_hours",)
+    # Only the most recent records are editable inline; the rest are one
+    # click away in the time record changelist.
+    max_records = 31
+
+    def get_queryset(self, request):
+        # Each row's label goes through DailyTimeRecord.__str__.
+        return super().get_queryset(request).select_related("internship__user")
+
+    def recent_queryset(self, queryset, internship):
+        recent = (
+            DailyTimeRecord.objects.filter(internship=internship)
+            .order_by("-date")
+            .values_list("pk", flat=True)[: self.max_records]
+        )
+        return queryset.filter(pk__in=list(recent))
 
 
 @admin.register(Internship)
@@ -27,9 +71,115 @@ class InternshipAdmin(admin.ModelAdmin):
         "supervisor_name",
         "start_date",
         "total_hours_required",
-        "total_hours_logged",
+        "hours_logged_display",
+        "progress_display",
+        "days_attended",
     )
+    list_select_related = ("user",)
     search_fields = ("user__username", "company_name", "supervisor_name")
     list_filter = ("start_date",)
+    autocomplete_fields = ("user",)
+    readonly_fields = (
+        "hours_logged",
+        "days_attended",
+        "holiday_count",
+        "weekend_count",
+        "absent_count",
+        "time_records",
+    )
 
     inlines = [DailyTimeRecordInline]  # 👈 THIS is the key part
+
+    def get_queryset(self, request):
+        # Hours come from the stored rollup, so progress is plain arithmetic
+        # on two columns and sorts in the same query.
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                progress=ExpressionWrapper(
+                    F("hours_logged") * 100.0 / F("total_hours_required"),
+                    output_field=FloatField(),
+                )
+            )
+        )
+
+    @admin.display(description="Hours logged", ordering="hours_logged")
+    def hours_logged_display(self, obj):
+        return round(obj.hours_logged, 2)
+
+    @admin.display(description="Progress", ordering="progress")
+    def progress_display(self, obj):
+        return f"{obj.progress or 0:.1f}%"
+
+    @admin.display(description="Time records")
+    def time_records(self, obj):
+        if obj.pk is None:
+            return "-"
+        url = reverse("admin:Main_dailytimerecord_changelist")
+        return format_html(
+            '<a href="{}?internship__id__exact={}">All time records</a> '
+            "(the {} most recent are editable below)",
+            url,
+            obj.pk,
+            DailyTimeRecordInline.max_records,
+        )
+
+    def get_formset_kwargs(self, request, obj, inline, prefix):
+        kwargs = super().get_formset_kwargs(request, obj, inline, prefix)
+        if isinstance(inline, DailyTimeRecordInline) and obj is not None and obj.pk:
+            kwargs["queryset"] = inline.recent_queryset(kwargs["queryset"], obj)
+        return kwargs
+
+
+@admin.register(DailyTimeRecord)
+class DailyTimeRecordAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "intern",
+        "company",
+        "am_in",
+        "am_out",
+        "pm_in",
+        "pm_out",
+        "total_hours",
+        "is_holiday",
+        "is_weekend",
+        "is_absent",
+    )
+    list_select_related = ("internship__user",)
+    list_filter = ("is_holiday", "is_weekend", "is_absent")
+    date_hierarchy = "date"
+    search_fields = ("internship__user__username", "internship__company_name")
+    autocomplete_fields = ("internship",)
+    readonly_fields = ("total_hours", "updated_at")
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description="Intern", ordering="internship__user__username")
+    def intern(self, obj):
+        return obj.internship.user.username
+
+    @admin.display(description="Company", ordering="internship__company_name")
+    def company(self, obj):
+        return obj.internship.company_name
+
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes skip DailyTimeRecord.delete(), so the affected
+        # rollups are recomputed instead.
+        with transaction.atomic():
+            deleted = defaultdict(list)
+            for internship_id, day in queryset.values_list("internship_id", "date"):
+                deleted[internship_id].append(day)
+            super().delete_queryset(request, queryset)
+            for internship_id, days in deleted.items():
+                record_tombstones(internship_id, days)
+            refresh_rollups(deleted)
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ("date", "name", "company_name")
+    list_filter = ("company_name",)
+    search_fields = ("name", "company_name")
+    date_hierarchy = "date"
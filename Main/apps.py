@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class MainConfig(AppConfig):
-    name = 'Main'
\ No newline at end of file
+    name = 'Main'
+
+    def ready(self):
+        from . import holidays  # noqa: F401 (connects the Holiday signals)
@@ -0,0 +1,67 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.http import Http404
+
+from .models import Internship
+
+
+class InternshipBackend(ModelBackend):
+    """
+    ModelBackend that loads the signed-in user's Internship in the same query
+    as the user, so request.user.internship costs no extra round trip.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related("internship").get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await User._default_manager.select_related("internship").aget(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+def get_user_internship(user):
+    """
+    The user's Internship, or None for anonymous users and accounts without
+    one. Cached on the user, so it is looked up at most once per request.
+    """
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.internship
+    except Internship.DoesNotExist:
+        return None
+
+
+async def aget_user_internship(user):
+    if not user.is_authenticated:
+        return None
+    try:
+        if User.internship.is_cached(user):
+            return user.internship
+        # Sessions from before InternshipBackend load the user on its own.
+        internship = await Internship.objects.aget(user=user)
+    except Internship.DoesNotExist:
+        return None
+    User.internship.related.set_cached_value(user, internship)
+    return internship
+
+
+def internship_or_404(request):
+    internship = get_user_internship(request.user)
+    if internship is None:
+        raise Http404("No internship for this account.")
+    return internship
+
+
+async def ainternship_or_404(request):
+    internship = await aget_user_internship(await request.auser())
+    if internship is None:
+        raise Http404("No internship for this account.")
+    return internship
@@ -0,0 +1,127 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+
+class CacheCounter:
+    """
+    Thread-safe hit/miss counters for one cache, kept per process.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+stats_cache_counter = CacheCounter("internship-stats")
+calendar_fragment_counter = CacheCounter("calendar-fragment")
+stats_fragment_counter = CacheCounter("stats-fragment")
+
+
+def cache_counters():
+    return [
+        counter.snapshot()
+        for counter in (stats_cache_counter, calendar_fragment_counter, stats_fragment_counter)
+    ]
+
+
+def stats_cache_key(internship, day):
+    # updated_at moves with every write to the internship or its records, so
+    # every process sees a new key after a write without being told. The
+    # local date is part of the key because the stats are relative to
+    # "today": a new day simply starts from a cold key.
+    return f"internship-stats:{internship.pk}:{internship.updated_at.timestamp()}:{day.isoformat()}"
+
+
+def get_cached_stats(internship, compute, version=None):
+    """
+    Stats for today from the cache, computed on a miss. An entry stored under
+    a different `version` (the shared holiday calendar's) counts as a miss.
+    Entries are never invalidated, only left to expire.
+    """
+    today = timezone.localdate()
+    key = stats_cache_key(internship, today)
+
+    cached = cache.get(key)
+    if cached is None or cached[0] != version:
+        stats_cache_counter.miss()
+        stats = compute(internship, today)
+        cache.set(key, (version, stats), settings.STATS_CACHE_TIMEOUT)
+    else:
+        stats_cache_counter.hit()
+        stats = cached[1]
+    return stats
+
+
+async def aget_cached_stats(internship, compute, version=None):
+    today = timezone.localdate()
+    key = stats_cache_key(internship, today)
+
+    cached = await cache.aget(key)
+    if cached is None or cached[0] != version:
+        stats_cache_counter.miss()
+        stats = await compute(internship, today)
+        await cache.aset(key, (version, stats), settings.STATS_CACHE_TIMEOUT)
+    else:
+        stats_cache_counter.hit()
+        stats = cached[1]
+    return stats
+
+
+def fragment_cache_key(name, *vary_on):
+    digest = hashlib.md5(
+        ":".join(str(part) for part in vary_on).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"fragment:{name}:{digest}"
+
+
+def get_cached_fragment(counter, key, render):
+    """
+    Rendered HTML from the cache, rendered with `render()` and stored on a
+    miss. Keys carry the data version, so entries are never invalidated,
+    only left to expire.
+    """
+    html = cache.get(key)
+    if html is None:
+        counter.miss()
+        html = str(render())
+        cache.set(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+    else:
+        counter.hit()
+    return mark_safe(html)
+
+
+async def aget_cached_fragment(counter, key, render):
+    html = await cache.aget(key)
+    if html is None:
+        counter.miss()
+        html = str(await render())
+        await cache.aset(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+    else:
+        counter.hit()
+    return mark_safe(html)
@@ -0,0 +1,86 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .backends import aget_user_internship, get_user_internship
+from .holidays import holiday_calendar
+
+
+def internship_version(internship):
+    return internship and (internship.pk, internship.updated_at)
+
+
+def condition_on_internship(vary_on=None):
+    """
+    Conditional GET for views whose output depends only on the signed-in
+    user's internship and its records, the shared holiday calendar, plus
+    whatever `vary_on(request)` returns (None skips the check for that
+    request).
+
+    The version check reads Internship.updated_at from the internship that
+    InternshipBackend loads with the user (the holiday calendar's version is
+    held in memory). When the client's ETag or Last-Modified still matches,
+    a 304 goes back without running the view. Works for both sync and async
+    views.
+    """
+
+    def validators(request, version):
+        if version is None or request.method not in ("GET", "HEAD"):
+            return None
+        extra = vary_on(request) if vary_on else ""
+        if extra is None:
+            return None
+        internship_id, updated_at = version
+        etag = hashlib.md5(
+            f"{internship_id}-{updated_at.timestamp():.6f}-{holiday_calendar.version}-{extra}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        etag = quote_etag(etag)
+        return etag, int(max(updated_at.timestamp(), holiday_calendar.last_modified))
+
+    def not_modified(request, checked):
+        if checked is None:
+            return None
+        etag, last_modified = checked
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        return response and finish(response, checked)
+
+    def finish(response, checked):
+        if checked and response.status_code in (200, 304):
+            etag, last_modified = checked
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+            # Browsers must come back to revalidate, and shared caches must
+            # not keep one intern's page.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                internship = await aget_user_internship(await request.auser())
+                checked = await sync_to_async(validators)(
+                    request, internship_version(internship)
+                )
+                return not_modified(request, checked) or finish(
+                    await view(request, *args, **kwargs), checked
+                )
+
+        else:
+
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                internship = get_user_internship(request.user)
+                checked = validators(request, internship_version(internship))
+                return not_modified(request, checked) or finish(
+                    view(request, *args, **kwargs), checked
+                )
+
+        return inner
+
+    return decorator
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import date, time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .holidays import holiday_calendar
+from .models import (
+    DailyTimeRecord,
+    apply_monthly_deltas,
+    month_start,
+    record_tombstones,
+)
+
+TIME_FIELDS = ("am_in", "am_out", "pm_in", "pm_out")
+MARK_ACTIONS = {
+    "holiday": "is_holiday",
+    "weekend": "is_weekend",
+    "absent": "is_absent",
+}
+ACTIONS = ("set", "clear", *MARK_ACTIONS)
+
+
+def parse_time(value):
+    value = (value or "").strip()
+    return time.fromisoformat(value) if value else None
+
+
+def plan_operation(internship, operation, current, shared_holiday=False):
+    """
+    Returns the record the day should hold after `operation` (None to clear
+    it), given its `current` record and whether the day is a shared holiday.
+    Raises ValidationError for bad input.
+
+    Like a quick log, setting times is refused on a day marked holiday,
+    weekend or absent (clear it first) and on a shared holiday the intern
+    has no record for.
+    """
+    action = operation.get("action")
+    if action not in ACTIONS:
+        raise ValidationError({"action": f"Expected one of {', '.join(ACTIONS)}."})
+
+    if action == "clear":
+        return None
+
+    record = DailyTimeRecord(internship=internship, date=operation["date"])
+    if action in MARK_ACTIONS:
+        setattr(record, MARK_ACTIONS[action], True)
+    else:
+        try:
+            times = {field: parse_time(operation.get(field)) for field in TIME_FIELDS}
+        except (AttributeError, ValueError):
+            raise ValidationError("Times must look like HH:MM.")
+
+        if not any(times.values()):
+            # Same as the edit form: emptying a marked day leaves the mark.
+            if current and (current.is_holiday or current.is_weekend or current.is_absent):
+                return current
+            return None
+
+        marked = current and (current.is_holiday or current.is_weekend or current.is_absent)
+        if marked or (current is None and shared_holiday):
+            raise ValidationError("Cannot log time on a holiday, weekend, or absent day.")
+
+        for field, value in times.items():
+            setattr(record, field, value)
+        record.clean()
+
+    record.total_hours = record.compute_total_hours()
+    return record
+
+
+def apply_day_operations(internship, operations):
+    """
+    Applies a list of {"date", "action", ...times} operations to an
+    internship's records in one transaction: one read, one upsert, at most
+    one delete and one rollup update, however many days are touched.
+
+    Operations run in order, so a later one for the same date wins. Invalid
+    operations are reported and skipped without affecting the others.
+    Returns one result dict per operation.
+    """
+    results = [None] * len(operations)
+    parsed = []
+    for index, operation in enumerate(operations):
+        try:
+            record_date = date.fromisoformat(operation["date"])
+        except (KeyError, TypeError, ValueError):
+            results[index] = {"ok": False, "errors": {"date": ["Expected YYYY-MM-DD."]}}
+            continue
+        parsed.append((index, {**operation, "date": record_date}))
+
+    with transaction.atomic():
+        existing = {
+            r.date: r
+            for r in DailyTimeRecord.objects.filter(
+                internship=internship, date__in={op["date"] for _, op in parsed}
+            )
+        }
+
+        planned = {}
+        for index, operation in parsed:
+            record_date = operation["date"]
+            current = planned.get(record_date, existing.get(record_date))
+            shared = current is None and holiday_calendar.is_holiday(
+                internship.company_name, record_date
+            )
+            try:
+                record = plan_operation(internship, operation, current, shared)
+            except ValidationError as e:
+                results[index] = {
+                    "date": record_date.isoformat(),
+                    "ok": False,
+                    "errors": e.message_dict if hasattr(e, "error_dict") else {"__all__": e.messages},
+                }
+                continue
+
+            planned[record_date] = record
+            results[index] = {
+                "date": record_date.isoformat(),
+                "ok": True,
+                "total_hours": record.total_hours if record else 0,
+            }
+
+        upserts = [
+            DailyTimeRecord(
+                internship=internship,
+                date=record_date,
+                total_hours=record.total_hours,
+                is_holiday=record.is_holiday,
+                is_weekend=record.is_weekend,
+                is_absent=record.is_absent,
+                **{field: getattr(record, field) for field in TIME_FIELDS},
+            )
+            for record_date, record in planned.items()
+            if record is not None
+        ]
+        deletes = [d for d, record in planned.items() if record is None and d in existing]
+
+        if upserts:
+            DailyTimeRecord.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=["internship", "date"],
+                update_fields=[
+                    *TIME_FIELDS,
+                    "total_hours",
+                    "is_holiday",
+                    "is_weekend",
+                    "is_absent",
+                    "updated_at",
+                ],
+            )
+        if deletes:
+            DailyTimeRecord.objects.filter(internship=internship, date__in=deletes).delete()
+            record_tombstones(internship.pk, deletes)
+
+        delta = [0] * 5
+        monthly = defaultdict(lambda: [0] * 5)
+        for record_date, record in planned.items():
+            old = existing.get(record_date)
+            for i, (n, o) in enumerate(
+                zip(
+                    record.rollup_contribution() if record else (0,) * 5,
+                    old.rollup_contribution() if old else (0,) * 5,
+                )
+            ):
+                delta[i] += n - o
+                monthly[month_start(record_date)][i] += n - o
+        internship.apply_rollup_delta(delta)
+        apply_monthly_deltas(internship.pk, monthly)
+
+    return results
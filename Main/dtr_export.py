@@ -0,0 +1,137 @@
+import csv
+from calendar import monthrange
+from datetime import date
+
+from django.db.models import Max, Min
+
+from .holidays import filter_company
+from .models import DailyTimeRecord, Internship, month_start
+from .stats import month_totals
+
+EXPORT_HEADER = (
+    "username",
+    "date",
+    "am_in",
+    "am_out",
+    "pm_in",
+    "pm_out",
+    "total_hours",
+    "is_holiday",
+    "is_weekend",
+    "is_absent",
+)
+
+SUMMARY_HEADER = (
+    "username",
+    "month",
+    "hours",
+    "days_attended",
+    "holidays",
+    "weekends",
+    "absences",
+)
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line straight back, so csv.writer
+    can feed a streaming response without buffering.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(internship=None, company=None, username=None, start=None, end=None):
+    records = DailyTimeRecord.objects.all()
+    if internship is not None:
+        records = records.filter(internship=internship)
+    if company:
+        records = filter_company(records, company, "internship__company_name")
+    if username:
+        records = records.filter(internship__user__username=username)
+    if start:
+        records = records.filter(date__gte=start)
+    if end:
+        records = records.filter(date__lte=end)
+    return records.order_by("internship__user__username", "date")
+
+
+def export_internships(internship=None, company=None, username=None):
+    internships = Internship.objects.all()
+    if internship is not None:
+        internships = internships.filter(pk=internship.pk)
+    if company:
+        internships = filter_company(internships, company)
+    if username:
+        internships = internships.filter(user__username=username)
+    return internships
+
+
+def month_bounds(year, month):
+    _, last_day = monthrange(year, month)
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def export_lines(records, chunk_size=2000):
+    """
+    Yields the CSV export of `records` line by line, reading the rows as
+    plain tuples in chunks so memory stays flat however many are exported.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+
+    rows = records.values_list(
+        "internship__user__username",
+        "date",
+        "am_in",
+        "am_out",
+        "pm_in",
+        "pm_out",
+        "total_hours",
+        "is_holiday",
+        "is_weekend",
+        "is_absent",
+    ).iterator(chunk_size=chunk_size)
+
+    for username, day, am_in, am_out, pm_in, pm_out, hours, *marks in rows:
+        yield writer.writerow(
+            (
+                username,
+                day.isoformat(),
+                am_in.strftime("%H:%M") if am_in else "",
+                am_out.strftime("%H:%M") if am_out else "",
+                pm_in.strftime("%H:%M") if pm_in else "",
+                pm_out.strftime("%H:%M") if pm_out else "",
+                f"{hours:g}",
+                *(int(mark) for mark in marks),
+            )
+        )
+
+
+def summary_lines(internships, start=None, end=None):
+    """
+    Yields a CSV of monthly totals per intern in `internships`, covering the
+    whole months from start to end (by default every month with records).
+    Finished months are read from MonthlyRollup rather than the records.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(SUMMARY_HEADER)
+
+    ids = internships.values("pk")
+    if start is None or end is None:
+        span = DailyTimeRecord.objects.filter(internship__in=ids).aggregate(
+            first=Min("date"), last=Max("date")
+        )
+        start, end = start or span["first"], end or span["last"]
+        if start is None or end is None:
+            return
+
+    totals = month_totals(ids, month_start(start), month_start(end))
+    usernames = dict(internships.values_list("pk", "user__username"))
+    # One row per intern and month, so sorting in memory stays small.
+    for internship_id, month in sorted(totals, key=lambda key: (usernames[key[0]], key[1])):
+        hours, *counts = totals[internship_id, month]
+        yield writer.writerow(
+            (usernames[internship_id], month.strftime("%Y-%m"), f"{hours:g}", *counts)
+        )
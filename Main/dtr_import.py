@@ -0,0 +1,187 @@
+import csv
+from collections import defaultdict
+from datetime import date, time
+
+from django.db import transaction
+
+from .hours import total_hours
+from .models import (
+    ROLLUP_FIELDS,
+    DailyTimeRecord,
+    Internship,
+    apply_monthly_deltas,
+    month_start,
+)
+
+TIME_FIELDS = ("am_in", "am_out", "pm_in", "pm_out")
+MARK_FIELDS = ("is_holiday", "is_weekend", "is_absent")
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def parse_time(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    # fromisoformat takes both HH:MM and HH:MM:SS and is far cheaper than strptime.
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"invalid time {value!r}")
+
+
+def parse_row(row):
+    """
+    Returns (date, times dict, marks dict) for a CSV row, applying the same
+    ordering rules as DailyTimeRecord.clean().
+    """
+    try:
+        record_date = date.fromisoformat((row.get("date") or "").strip())
+    except ValueError:
+        raise RowError(f"invalid date {row.get('date')!r}")
+
+    times = {field: parse_time(row.get(field)) for field in TIME_FIELDS}
+    marks = {
+        field: (row.get(field) or "").strip().lower() in TRUE_VALUES
+        for field in MARK_FIELDS
+    }
+
+    if sum(marks.values()) > 1:
+        raise RowError("only one of holiday, weekend or absent may be set")
+    if any(marks.values()) and any(times.values()):
+        raise RowError("holiday, weekend and absent days cannot have time entries")
+
+    am_in, am_out, pm_in, pm_out = (times[field] for field in TIME_FIELDS)
+    if am_in and am_out and am_out <= am_in:
+        raise RowError("AM out must be after AM in.")
+    if pm_in and pm_out and pm_out <= pm_in:
+        raise RowError("PM out must be after PM in.")
+    if am_out and pm_in and pm_in <= am_out:
+        raise RowError("PM in must be after AM out.")
+
+    return record_date, times, marks
+
+
+def batch_total_hours(parsed):
+    """
+    total_hours for a whole batch of parsed rows, with the same integer-minute
+    calculator DailyTimeRecord.save() uses.
+    """
+    return [
+        total_hours(*(times[field] for field in TIME_FIELDS), marked=any(marks.values()))
+        for _, times, marks in parsed
+    ]
+
+
+def import_records(lines, internship=None, batch_size=1000):
+    """
+    Upserts DailyTimeRecords from CSV lines with a header row.
+
+    Rows go to `internship` when given, otherwise to the internship of the
+    row's `username` column. Invalid rows are reported and skipped; each batch
+    is written in one transaction with bulk_create on (internship, date),
+    and the rollups move by the difference to the records it replaced.
+    Returns (rows imported, [(line number, message), ...]).
+    """
+    reader = csv.DictReader(lines)
+    if internship is None and "username" not in (reader.fieldnames or ()):
+        raise ValueError("CSV needs a 'username' column.")
+
+    imported = 0
+    errors = []
+    batch = []
+    for row in reader:
+        batch.append((reader.line_num, row))
+        if len(batch) >= batch_size:
+            imported += _import_batch(batch, internship, errors)
+            batch = []
+    if batch:
+        imported += _import_batch(batch, internship, errors)
+    return imported, errors
+
+
+def _import_batch(batch, internship, errors):
+    if internship is not None:
+        internships = None
+    else:
+        usernames = {(row.get("username") or "").strip() for _, row in batch}
+        internships = {
+            i.user.username: i
+            for i in Internship.objects.filter(user__username__in=usernames).select_related("user")
+        }
+
+    parsed = []
+    owners = []
+    seen = {}
+    for line_num, row in batch:
+        try:
+            if internships is None:
+                owner = internship
+            else:
+                username = (row.get("username") or "").strip()
+                owner = internships.get(username)
+                if owner is None:
+                    raise RowError(f"no internship for user {username!r}")
+            record = parse_row(row)
+        except RowError as e:
+            errors.append((line_num, str(e)))
+            continue
+
+        # A later row for the same day wins, as it would with one POST per day.
+        key = (owner.pk, record[0])
+        if key in seen:
+            index = seen[key]
+            parsed[index] = record
+            owners[index] = owner
+        else:
+            seen[key] = len(parsed)
+            parsed.append(record)
+            owners.append(owner)
+
+    if not parsed:
+        return 0
+
+    records = [
+        DailyTimeRecord(
+            internship=owner,
+            date=record_date,
+            total_hours=total_hours,
+            **times,
+            **marks,
+        )
+        for owner, (record_date, times, marks), total_hours in zip(
+            owners, parsed, batch_total_hours(parsed)
+        )
+    ]
+
+    with transaction.atomic():
+        replaced = {
+            (r.internship_id, r.date): r
+            for r in DailyTimeRecord.objects.filter(
+                internship__in={owner.pk for owner in owners},
+                date__in={record.date for record in records},
+            )
+        }
+        DailyTimeRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["internship", "date"],
+            update_fields=[*TIME_FIELDS, *MARK_FIELDS, "total_hours", "updated_at"],
+        )
+
+        deltas = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+        monthly = defaultdict(lambda: defaultdict(lambda: [0] * len(ROLLUP_FIELDS)))
+        for owner, record in zip(owners, records):
+            old = replaced.get((owner.pk, record.date))
+            new = record.rollup_contribution()
+            for i, o in enumerate(old.rollup_contribution() if old else (0,) * len(new)):
+                deltas[owner][i] += new[i] - o
+                monthly[owner.pk][month_start(record.date)][i] += new[i] - o
+        for owner, delta in deltas.items():
+            owner.apply_rollup_delta(delta)
+            apply_monthly_deltas(owner.pk, monthly[owner.pk])
+
+    return len(records)
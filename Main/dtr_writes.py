@@ -0,0 +1,119 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .dtr_batch import MARK_ACTIONS, TIME_FIELDS
+from .models import DailyTimeRecord, record_tombstones
+
+MARK_FIELDS = tuple(MARK_ACTIONS.values())
+RECORD_FIELDS = (*TIME_FIELDS, *MARK_FIELDS)
+
+
+class RecordChanged(Exception):
+    """
+    The day's record changed between reading it and writing it, e.g. in
+    another tab; nothing was written.
+    """
+
+
+def read_day(internship, day):
+    return DailyTimeRecord.objects.filter(internship=internship, date=day).first()
+
+
+def record_values(record):
+    """
+    The record fields of `record`, or those of a blank day for None
+    """
+    if record is None:
+        return {field: None for field in TIME_FIELDS} | {field: False for field in MARK_FIELDS}
+    return {field: getattr(record, field) for field in RECORD_FIELDS}
+
+
+def write_day(internship, day, current, values):
+    """
+    Makes the day hold `values` (see record_values; None removes the day)
+    given `current`, its record as read before (None if it had none).
+
+    The record is written with one conditional statement: an UPDATE or
+    DELETE that only matches while the row still holds what was read, or an
+    INSERT that fails if the day was created meanwhile. Hours are computed
+    here first, and the rollups move by the difference to `current`.
+    Raises RecordChanged when the row changed since it was read, and
+    ValidationError for times out of order. Returns the written record.
+    """
+    if values is None:
+        if current is not None:
+            _delete_day(internship, day, current)
+        return None
+
+    record = DailyTimeRecord(internship=internship, date=day, **values)
+    record.clean()
+    record.total_hours = record.compute_total_hours()
+
+    try:
+        with transaction.atomic():
+            if current is None:
+                # A concurrent first write makes this INSERT fail on the
+                # (internship, date) constraint.
+                DailyTimeRecord.objects.bulk_create([record])
+            else:
+                record.pk = current.pk
+                record.updated_at = timezone.now()
+                updated = unchanged(current).update(
+                    total_hours=record.total_hours,
+                    updated_at=record.updated_at,
+                    **values,
+                )
+                if not updated:
+                    raise RecordChanged
+                record._rollup_snapshot = current._rollup_snapshot
+            record._update_rollup(record.rollup_contribution())
+    except IntegrityError:
+        raise RecordChanged
+    record._stored_day = (internship.pk, day)
+    return record
+
+
+def _delete_day(internship, day, current):
+    with transaction.atomic():
+        deleted, _ = unchanged(current).delete()
+        if not deleted:
+            raise RecordChanged
+        record_tombstones(internship.pk, [day])
+        current._update_rollup(None)
+
+
+def unchanged(record):
+    # The record's row, as long as it still holds what was read.
+    return DailyTimeRecord.objects.filter(
+        pk=record.pk, **{field: getattr(record, field) for field in RECORD_FIELDS}
+    )
+
+
+def mark_values(current, mark, shared_holiday=False):
+    """
+    What the day holds after the mark-day button for `mark` ("holiday",
+    "weekend" or "absent") is pressed: the mark toggles, marking clears the
+    times, and unmarking a day without times removes it. The shared
+    calendar decides holidays for days without a record, so for those a
+    record of the intern's own is the override either way.
+    """
+    values = record_values(current)
+    has_times = any(values[field] for field in TIME_FIELDS)
+    field = MARK_ACTIONS[mark]
+
+    if mark == "holiday" and shared_holiday:
+        if current is None:
+            # A blank record overrides the shared holiday
+            return values
+        if values["is_holiday"]:
+            return values | {"is_holiday": False}
+        # Marking a shared holiday again just drops the override
+        return None
+
+    if values[field]:
+        # Unmarking - delete if no time entries exist
+        return values | {field: False} if has_times else None
+
+    return {name: None for name in TIME_FIELDS} | {
+        name: name == field for name in MARK_FIELDS
+    }
@@ -0,0 +1,183 @@
+import csv
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Trim
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Holiday
+
+
+def company_key(company_name):
+    return (company_name or "").strip().casefold()
+
+
+def filter_company(queryset, company_name, field="company_name"):
+    """
+    Narrows `queryset` to `company_name` compared the way company_key()
+    compares it, ignoring case and surrounding spaces, so a cohort or an
+    export covers the same interns as the company's shared holidays.
+    """
+    return queryset.alias(company=Trim(field)).filter(
+        company__iexact=(company_name or "").strip()
+    )
+
+
+class HolidayCalendar:
+    """
+    Per-process copy of the shared Holiday table.
+
+    The table is small and read on every dashboard request, so each process
+    keeps it in memory. At most every HOLIDAY_CALENDAR_CHECK_SECONDS it asks
+    the database for the data version (row count and latest updated_at) and
+    reloads when that changed; writes made in this process drop the copy at
+    once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._version = None
+        self._latest = 0
+        self._by_company = {}
+        self._merged = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = None
+
+    def _current_version(self):
+        stats = Holiday.objects.aggregate(count=Count("pk"), latest=Max("updated_at"))
+        latest = stats["latest"].timestamp() if stats["latest"] else 0
+        return f"{stats['count']}-{latest:.6f}", latest
+
+    def _refresh(self):
+        now = time.monotonic()
+        with self._lock:
+            fresh = (
+                self._checked_at is not None
+                and now - self._checked_at < settings.HOLIDAY_CALENDAR_CHECK_SECONDS
+            )
+            if fresh:
+                return
+
+        version, latest = self._current_version()
+        by_company = None
+        if version != self._version:
+            by_company = defaultdict(set)
+            for day, company_name in Holiday.objects.values_list("date", "company_name"):
+                by_company[company_key(company_name)].add(day)
+            by_company = {key: sorted(days) for key, days in by_company.items()}
+        with self._lock:
+            if by_company is not None:
+                self._version = version
+                self._latest = latest
+                self._by_company = by_company
+                self._merged = {}
+            self._checked_at = now
+
+    @property
+    def version(self):
+        self._refresh()
+        return self._version
+
+    @property
+    def last_modified(self):
+        # Latest change as a timestamp; a deletion alone only moves `version`.
+        self._refresh()
+        return self._latest
+
+    def dates_for(self, company_name, start=None, end=None):
+        """
+        Sorted shared holidays that apply to `company_name` (the global ones
+        plus its own), limited to start <= d <= end when given.
+        """
+        self._refresh()
+        key = company_key(company_name)
+        with self._lock:
+            days = self._merged.get(key)
+            if days is None:
+                days = self._merged[key] = sorted(
+                    {*self._by_company.get("", ()), *self._by_company.get(key, ())}
+                )
+        lo = bisect_left(days, start) if start else 0
+        hi = bisect_left(days, date.fromordinal(end.toordinal() + 1)) if end else len(days)
+        return days[lo:hi]
+
+    def is_holiday(self, company_name, day):
+        return bool(self.dates_for(company_name, day, day))
+
+
+holiday_calendar = HolidayCalendar()
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def holidays_changed(**kwargs):
+    transaction.on_commit(holiday_calendar.invalidate)
+
+
+class HolidayFileError(ValueError):
+    pass
+
+
+def load_holidays(lines, company_name=None, replace=False):
+    """
+    Upserts shared holidays from CSV lines with a header row of date, name
+    and optionally company (blank for every company). `company_name`
+    overrides the column. With `replace`, holidays in the same scope that
+    are missing from the file are deleted. Returns (loaded, deleted).
+    """
+    reader = csv.DictReader(lines)
+    if not {"date", "name"} <= set(reader.fieldnames or ()):
+        raise HolidayFileError("CSV needs 'date' and 'name' columns.")
+
+    holidays = {}
+    for row in reader:
+        try:
+            day = date.fromisoformat((row.get("date") or "").strip())
+        except ValueError:
+            raise HolidayFileError(
+                f"line {reader.line_num}: invalid date {row.get('date')!r}"
+            )
+        name = (row.get("name") or "").strip()
+        if not name:
+            raise HolidayFileError(f"line {reader.line_num}: missing name")
+        company = company_name if company_name is not None else row.get("company")
+        company = (company or "").strip()
+        # A later row for the same day and scope wins.
+        holidays[(day, company)] = Holiday(date=day, name=name, company_name=company)
+
+    deleted = 0
+    with transaction.atomic():
+        if replace:
+            scopes = {company_key(company) for _, company in holidays}
+            if company_name is not None:
+                scopes.add(company_key(company_name))
+            for scope in scopes:
+                # Rows spelt differently from the file ("acme" for "Acme")
+                # go too: the upsert below keys on the exact spelling.
+                keep = Q(pk__in=[])
+                for day, company in holidays:
+                    if company_key(company) == scope:
+                        keep |= Q(date=day, company_name=company)
+                deleted += (
+                    filter_company(Holiday.objects.all(), scope)
+                    .exclude(keep)
+                    .delete()[0]
+                )
+        Holiday.objects.bulk_create(
+            holidays.values(),
+            update_conflicts=True,
+            unique_fields=["date", "company_name"],
+            update_fields=["name", "updated_at"],
+        )
+        transaction.on_commit(holiday_calendar.invalidate)
+    return len(holidays), deleted
@@ -0,0 +1,37 @@
+"""
+Worked-hours arithmetic on integer minutes since midnight.
+
+Time in is rounded up and time out down to the half hour (seconds are
+ignored), and a block only counts when it is still positive after rounding.
+"""
+
+ROUNDING_MINUTES = 30
+
+
+def to_minutes(t):
+    return t.hour * 60 + t.minute if t else None
+
+
+def block_minutes(time_in, time_out):
+    """
+    Minutes credited for one in/out pair given as minutes since midnight;
+    0 when either side is missing.
+    """
+    if time_in is None or time_out is None:
+        return 0
+    start = time_in + (-time_in % ROUNDING_MINUTES)
+    end = time_out - time_out % ROUNDING_MINUTES
+    return end - start if end > start else 0
+
+
+def total_hours(am_in, am_out, pm_in, pm_out, marked=False):
+    """
+    total_hours for one day from its four punches (datetime.time or None).
+    Holiday, weekend and absent days (`marked`) count as 0.
+    """
+    if marked:
+        return 0
+    worked = block_minutes(to_minutes(am_in), to_minutes(am_out)) + block_minutes(
+        to_minutes(pm_in), to_minutes(pm_out)
+    )
+    return worked / 60
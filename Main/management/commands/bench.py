@@ -0,0 +1,231 @@
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from Main.models import DailyTimeRecord
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an already sorted list.
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class Scenario:
+    """
+    One view to benchmark: `request(client, user, rng)` issues the request,
+    `setup(user)` runs untimed before each one.
+    """
+
+    def __init__(self, name, request, setup=None):
+        self.name = name
+        self.request = request
+        self.setup = setup
+
+
+def history_day(user, rng):
+    start = user.internship.start_date
+    span = max((timezone.localdate() - start).days, 1)
+    return start + timedelta(days=rng.randrange(span))
+
+
+def clear_today(user):
+    # Instance deletes keep the rollup in step.
+    for record in DailyTimeRecord.objects.filter(
+        internship=user.internship, date=timezone.localdate()
+    ):
+        record.delete()
+
+
+def build_scenarios():
+    def record_params(user, rng):
+        day = history_day(user, rng)
+        return {"day": day.day, "month": day.month, "year": day.year}
+
+    def month_params(user, rng):
+        day = history_day(user, rng)
+        return {"month": day.month, "year": day.year}
+
+    return [
+        Scenario("index", lambda c, u, rng: c.get(reverse("index"))),
+        Scenario(
+            "index (cold cache)",
+            lambda c, u, rng: c.get(reverse("index")),
+            setup=lambda u: cache.clear(),
+        ),
+        Scenario(
+            "get-daily-record",
+            lambda c, u, rng: c.get(reverse("get-daily-record"), record_params(u, rng)),
+        ),
+        Scenario(
+            "month-records",
+            lambda c, u, rng: c.get(reverse("month-records"), month_params(u, rng)),
+        ),
+        Scenario(
+            "quick-log",
+            lambda c, u, rng: c.post(reverse("quick-log"), {"log_action": "am_in"}),
+            setup=clear_today,
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main views through the test client against users created by "
+        "seed_benchmark and report latency percentiles, query counts and peak "
+        "allocations, optionally compared with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per view.")
+        parser.add_argument(
+            "--alloc-requests",
+            type=int,
+            default=20,
+            help="Requests per view traced with tracemalloc (kept apart from timing).",
+        )
+        parser.add_argument("--only", action="append", help="Run only this view (repeatable).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("-o", "--output", help="Write results as JSON to this file.")
+        parser.add_argument("--baseline", help="Compare with a JSON file from an earlier run.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Percent slower p95 that counts as a regression (default 10).",
+        )
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        users = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}-")
+            .select_related("internship")
+            .order_by("username")
+        )
+        if not users:
+            raise CommandError("No benchmark users found; run seed_benchmark first.")
+
+        clients = {}
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients[user.pk] = client
+
+        scenarios = build_scenarios()
+        if options["only"]:
+            scenarios = [s for s in scenarios if s.name in options["only"]]
+
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = self.run_scenario(scenario, users, clients, options)
+            self.report(scenario.name, results[scenario.name])
+
+        payload = {
+            "meta": {
+                "created": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "users": len(users),
+                "requests": options["requests"],
+            },
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(payload, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)["results"]
+            regressions = self.compare(results, baseline, options["threshold"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{regressions} regression(s) against {options['baseline']}.")
+
+    def run_scenario(self, scenario, users, clients, options):
+        rng = random.Random(options["seed"])
+        latencies = []
+        queries = []
+
+        for n in range(options["requests"]):
+            user = users[n % len(users)]
+            if scenario.setup:
+                scenario.setup(user)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = scenario.request(clients[user.pk], user, rng)
+                latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f"{scenario.name} returned {response.status_code}.")
+            queries.append(len(captured))
+
+        peaks = []
+        for n in range(options["alloc_requests"]):
+            user = users[n % len(users)]
+            if scenario.setup:
+                scenario.setup(user)
+            tracemalloc.start()
+            scenario.request(clients[user.pk], user, rng)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        latencies.sort()
+        queries.sort()
+        return {
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "queries_median": percentile(queries, 50),
+            "queries_max": queries[-1],
+            "peak_alloc_kb": round(max(peaks) / 1024, 1) if peaks else None,
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<20} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+            f"p99 {result['p99_ms']:8.2f}ms  queries {result['queries_median']}"
+            f"/{result['queries_max']}  peak {result['peak_alloc_kb']} KiB"
+        )
+
+    def compare(self, results, baseline, threshold):
+        regressions = 0
+        self.stdout.write("\nAgainst baseline:")
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f"{name:<20} (not in baseline)")
+                continue
+
+            change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+            slower = change > threshold
+            more_queries = result["queries_max"] > before["queries_max"]
+            line = (
+                f"{name:<20} p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f}ms ({change:+.1f}%)  "
+                f"queries {before['queries_max']} -> {result['queries_max']}"
+            )
+            if slower or more_queries:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION"))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        return regressions
@@ -0,0 +1,136 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from .bench import history_day, percentile
+
+
+async def asgi_get(app, path, query, cookie):
+    """
+    Sends one GET through the ASGI application and returns the status code.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"127.0.0.1"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    status = None
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Nothing else arrives; wait like a connected client would.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent requests at the ASGI application in-process, the way "
+        "many open modals hit get-daily-record at once, and report throughput "
+        "and latency per concurrency level. Run once with DJANGO_ASYNC_VIEWS "
+        "on and once off to compare the async views with their sync fallbacks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench")
+        parser.add_argument(
+            "--view",
+            choices=["get-daily-record", "index"],
+            default="get-daily-record",
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Requests per level.")
+        parser.add_argument(
+            "--concurrency",
+            default="1,10,50",
+            help="Comma-separated numbers of requests kept in flight.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        users = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}-")
+            .select_related("internship")
+            .order_by("username")
+        )
+        if not users:
+            raise CommandError("No benchmark users found; run seed_benchmark first.")
+        try:
+            levels = [int(n) for n in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency must be comma-separated integers.")
+
+        cookies = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            name = settings.SESSION_COOKIE_NAME
+            cookies.append(f"{name}={client.cookies[name].value}")
+
+        rng = random.Random(options["seed"])
+        path = reverse(options["view"])
+        plan = []
+        for n in range(options["requests"]):
+            user = users[n % len(users)]
+            if options["view"] == "get-daily-record":
+                day = history_day(user, rng)
+                query = urlencode({"day": day.day, "month": day.month, "year": day.year})
+            else:
+                query = ""
+            plan.append((query, cookies[n % len(users)]))
+
+        mode = "async" if settings.ASYNC_VIEWS else "sync"
+        self.stdout.write(f"{options['view']} ({mode} views), {len(plan)} requests per level")
+        app = ASGIHandler()
+        for level in levels:
+            elapsed, latencies, failures = asyncio.run(self.run_level(app, path, plan, level))
+            latencies.sort()
+            self.stdout.write(
+                f"concurrency {level:>4}  {len(plan) / elapsed:8.1f} req/s  "
+                f"p50 {percentile(latencies, 50):8.2f}ms  p95 {percentile(latencies, 95):8.2f}ms  "
+                f"p99 {percentile(latencies, 99):8.2f}ms  failures {failures}"
+            )
+
+    async def run_level(self, app, path, plan, level):
+        pending = iter(plan)
+        latencies = []
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            for query, cookie in pending:
+                started = time.perf_counter()
+                status = await asgi_get(app, path, query, cookie)
+                latencies.append((time.perf_counter() - started) * 1000)
+                failures += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(level)))
+        return time.perf_counter() - started, latencies, failures
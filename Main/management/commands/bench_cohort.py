@@ -0,0 +1,115 @@
+import math
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from Main.models import Internship
+from Main.stats import cohort_internships, get_cohort_stats, get_internship_stats
+
+STAFF_USERNAME = "cohort-bench-staff"
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an already sorted list.
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the cohort stats engine and the staff cohort page for one "
+        "company, and check a sample of interns against the per-intern "
+        "dashboard stats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", default="Benchmark Corp")
+        parser.add_argument("--requests", type=int, default=10, help="Timed runs per target.")
+        parser.add_argument(
+            "--parity",
+            type=int,
+            default=50,
+            help="Interns to compare with get_internship_stats (0 to skip).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=1000,
+            help="Fail when a target's p95 exceeds this (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        company = options["company"]
+        size = cohort_internships(company).count()
+        if not size:
+            raise CommandError(f"No internships at {company!r}; run seed_benchmark first.")
+        self.stdout.write(f"{company}: {size} interns")
+
+        staff, _ = User.objects.get_or_create(
+            username=STAFF_USERNAME, defaults={"is_staff": True}
+        )
+        client = Client()
+        client.force_login(staff)
+        url = reverse("cohort")
+
+        targets = {
+            "engine": lambda: get_cohort_stats(company),
+            "page": lambda: client.get(url, {"company": company}),
+            "json": lambda: client.get(url, {"company": company, "format": "json"}),
+        }
+        over_budget = []
+        for name, run in targets.items():
+            latencies = []
+            for _ in range(options["requests"]):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    result = run()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                if getattr(result, "status_code", 200) != 200:
+                    raise CommandError(f"{name} returned {result.status_code}.")
+            latencies.sort()
+            p95 = percentile(latencies, 95)
+            self.stdout.write(
+                f"{name:<8} p50 {percentile(latencies, 50):8.1f} ms  "
+                f"p95 {p95:8.1f} ms  queries {len(captured)}"
+            )
+            if p95 > options["budget_ms"]:
+                over_budget.append(name)
+
+        if options["parity"]:
+            self.check_parity(company, options["parity"], options["seed"])
+
+        if over_budget:
+            raise CommandError(
+                f"Over the {options['budget_ms']:g} ms budget: {', '.join(over_budget)}."
+            )
+
+    def check_parity(self, company, sample_size, seed):
+        today = timezone.localdate()
+        cohort = get_cohort_stats(company, today)
+        sample = random.Random(seed).sample(cohort, min(sample_size, len(cohort)))
+        internships = Internship.objects.in_bulk([member.pk for member, _ in sample])
+        mismatched = []
+        started = time.perf_counter()
+        for member, stats in sample:
+            if stats != get_internship_stats(internships[member.pk], today):
+                mismatched.append(member.username)
+        per_intern = (time.perf_counter() - started) * 1000 / len(sample)
+        self.stdout.write(
+            f"per-intern get_internship_stats: {per_intern:.2f} ms each, "
+            f"~{per_intern * len(cohort):.0f} ms for the whole cohort"
+        )
+        if mismatched:
+            raise CommandError(
+                f"Cohort stats differ from the dashboard for: {', '.join(mismatched)}."
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(sample)} sampled interns match the dashboard."))
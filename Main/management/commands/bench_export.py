@@ -0,0 +1,86 @@
+import os
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Main.dtr_export import export_lines, export_queryset
+
+
+def memory_mib():
+    """
+    (resident, anonymous) memory of this process. Pages of the database file
+    mapped by SQLite's mmap_size are resident but file-backed and
+    reclaimable, so only the anonymous part shows whether the export itself
+    holds on to rows. Where /proc is missing both are the peak RSS.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared, *_ = (int(value) for value in f.read().split())
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+    page = os.sysconf("SC_PAGE_SIZE") / 2**20
+    return resident * page, (resident - shared) * page
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the CSV export of every record (or one company's) and report "
+        "rows per second and resident memory, sampled as it goes, to check "
+        "that memory stays flat however many rows are exported. Seed a "
+        "scratch database first, e.g. seed_benchmark --users 5500 --days 250 "
+        "for about a million rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", help="Only interns at this company.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--sample-every", type=int, default=100000, help="Rows between RSS samples."
+        )
+        parser.add_argument(
+            "--budget-mib",
+            type=float,
+            default=64,
+            help=(
+                "Fail when anonymous memory grows by more than this during the "
+                "export (default 64; SQLite's page cache alone may take 32)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        records = export_queryset(company=options["company"])
+        lines = export_lines(records, chunk_size=options["chunk_size"])
+
+        before = memory_mib()
+        peak = before
+        rows = -1  # The header is not a row.
+        size = 0
+        started = time.perf_counter()
+        for line in lines:
+            rows += 1
+            size += len(line)
+            if rows and rows % options["sample_every"] == 0:
+                current = memory_mib()
+                peak = tuple(map(max, peak, current))
+                self.stdout.write(
+                    f"{rows:>10,} rows  RSS {current[0]:7.1f} MiB  anonymous {current[1]:7.1f} MiB"
+                )
+        elapsed = time.perf_counter() - started
+        peak = tuple(map(max, peak, memory_mib()))
+
+        if rows <= 0:
+            raise CommandError("Nothing to export; run seed_benchmark first.")
+        growth = peak[1] - before[1]
+        self.stdout.write(
+            f"{rows:,} rows ({size / 2**20:.1f} MiB of CSV) in {elapsed:.1f} s, "
+            f"{rows / elapsed:,.0f} rows/s\n"
+            f"RSS {before[0]:.1f} -> peak {peak[0]:.1f} MiB, "
+            f"anonymous {before[1]:.1f} -> peak {peak[1]:.1f} MiB ({growth:+.1f})"
+        )
+        if growth > options["budget_mib"]:
+            raise CommandError(
+                f"Anonymous memory grew by {growth:.1f} MiB, over the "
+                f"{options['budget_mib']:g} MiB budget."
+            )
@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Main.workdays import WORKDAYS_PER_WEEK, WorkdayCalendar
+
+
+def loop_count(calendar, start, end):
+    # What WorkdayCalendar.count replaced: one step per calendar day.
+    days = 0
+    current = start
+    while current < end:
+        days += calendar.is_working_day(current)
+        current += timedelta(days=1)
+    return days
+
+
+def loop_add(calendar, start, n):
+    current = start
+    while n > 0:
+        current += timedelta(days=1)
+        n -= calendar.is_working_day(current)
+    return current
+
+
+def timed(calls, run):
+    started = time.perf_counter()
+    results = [run(*args) for args in calls]
+    return (time.perf_counter() - started) * 1e6 / len(calls), results
+
+
+class Command(BaseCommand):
+    help = (
+        "Time WorkdayCalendar.count and add against the day-by-day loops they "
+        "replaced, over random ranges and holidays, and check that they agree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=2000, help="Timed calls per method.")
+        parser.add_argument("--span-days", type=int, default=365, help="Longest range.")
+        parser.add_argument("--holidays", type=int, default=30)
+        parser.add_argument("--workdays-per-week", type=int, default=WORKDAYS_PER_WEEK)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        origin = date(2025, 1, 1)
+        span = options["span_days"]
+        calendar = WorkdayCalendar(
+            [origin + timedelta(days=rng.randrange(2 * span)) for _ in range(options["holidays"])],
+            options["workdays_per_week"],
+        )
+        ranges = []
+        for _ in range(options["calls"]):
+            start = origin + timedelta(days=rng.randrange(span))
+            ranges.append((calendar, start, start + timedelta(days=rng.randrange(span))))
+        steps = [
+            (calendar, start, rng.randrange(span * options["workdays_per_week"] // 7))
+            for _, start, _ in ranges
+        ]
+
+        mismatched = []
+        for name, fast, slow, calls in (
+            ("count", WorkdayCalendar.count, loop_count, ranges),
+            ("add", WorkdayCalendar.add, loop_add, steps),
+        ):
+            fast_us, fast_results = timed(calls, fast)
+            slow_us, slow_results = timed(calls, slow)
+            self.stdout.write(
+                f"{name:<6} closed form {fast_us:8.2f} us  day loop {slow_us:8.2f} us  "
+                f"x{slow_us / fast_us:.0f}"
+            )
+            if fast_results != slow_results:
+                mismatched.append(name)
+
+        if mismatched:
+            raise CommandError(f"Closed form differs from the day loop for: {', '.join(mismatched)}.")
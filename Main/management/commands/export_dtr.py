@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Main.dtr_export import (
+    export_internships,
+    export_lines,
+    export_queryset,
+    month_bounds,
+    summary_lines,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream daily time records as CSV for a month, a date range, a cohort or one intern."
+
+    def add_arguments(self, parser):
+        parser.add_argument("-o", "--output", help="File to write to (default: stdout).")
+        parser.add_argument("--month", help="Month to export, as YYYY-MM.")
+        parser.add_argument("--start", type=date.fromisoformat, help="First date, YYYY-MM-DD.")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last date, YYYY-MM-DD.")
+        parser.add_argument("--company", help="Only interns at this company.")
+        parser.add_argument("--username", help="Only this intern.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--summary",
+            action="store_true",
+            help="Export monthly totals per intern instead of the daily records.",
+        )
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if options["month"]:
+            try:
+                year, month = (int(part) for part in options["month"].split("-"))
+                start, end = month_bounds(year, month)
+            except ValueError:
+                raise CommandError("--month must look like YYYY-MM.")
+
+        scope = {"company": options["company"], "username": options["username"]}
+        if options["summary"]:
+            lines = summary_lines(export_internships(**scope), start, end)
+        else:
+            records = export_queryset(**scope, start=start, end=end)
+            lines = export_lines(records, chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
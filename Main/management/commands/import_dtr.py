@@ -0,0 +1,48 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Main.dtr_import import import_records
+from Main.models import Internship
+
+
+class Command(BaseCommand):
+    help = (
+        "Import daily time records from a CSV file with columns username, date, "
+        "am_in, am_out, pm_in, pm_out, is_holiday, is_weekend, is_absent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file")
+        parser.add_argument(
+            "--username",
+            help="Import every row into this user's internship instead of the username column.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        internship = None
+        if options["username"]:
+            internship = Internship.objects.filter(user__username=options["username"]).first()
+            if internship is None:
+                raise CommandError(f"No internship for user {options['username']!r}.")
+
+        started = time.perf_counter()
+        try:
+            with open(options["csv_file"], newline="", encoding="utf-8-sig") as f:
+                imported, errors = import_records(
+                    f, internship=internship, batch_size=options["batch_size"]
+                )
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for line_num, message in errors:
+            self.stderr.write(f"line {line_num}: {message}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} records in {elapsed:.2f}s ({len(errors)} rows rejected)."
+            )
+        )
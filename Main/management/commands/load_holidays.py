@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Main.holidays import load_holidays
+
+
+class Command(BaseCommand):
+    help = (
+        "Load shared holidays from a CSV file with columns date, name and "
+        "optionally company (blank applies to every company). Existing "
+        "holidays on the same day and scope are renamed, not duplicated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file")
+        parser.add_argument(
+            "--company",
+            help="Load every row for this company instead of the company column.",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete holidays in the loaded scopes that are not in the file.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_file"], newline="", encoding="utf-8-sig") as f:
+                loaded, deleted = load_holidays(
+                    f, company_name=options["company"], replace=options["replace"]
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Loaded {loaded} holidays ({deleted} removed).")
+        )
@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from Main.models import (
+    ROLLUP_FIELDS,
+    Internship,
+    MonthlyRollup,
+    compute_monthly_rollups,
+    compute_rollups,
+    refresh_monthly_rollups,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild (or with --check, verify) the stored hours/attendance rollup "
+        "on every internship and its monthly rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report internships whose rollup has drifted; exit non-zero if any did.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        empty = (0.0, 0, 0, 0, 0)
+        checked = drifted = months_drifted = 0
+
+        internships = Internship.objects.order_by("pk").only("pk", *ROLLUP_FIELDS)
+        last_pk = 0
+        while True:
+            batch = list(internships.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            with transaction.atomic():
+                expected = compute_rollups([i.pk for i in batch])
+                stale = []
+                for internship in batch:
+                    checked += 1
+                    actual = tuple(getattr(internship, name) for name in ROLLUP_FIELDS)
+                    wanted = expected.get(internship.pk, empty)
+                    if actual == wanted:
+                        continue
+
+                    drifted += 1
+                    self.stdout.write(
+                        f"Internship {internship.pk}: stored {actual}, expected {wanted}"
+                    )
+                    for name, value in zip(ROLLUP_FIELDS, wanted):
+                        setattr(internship, name, value)
+                    internship.updated_at = timezone.now()
+                    stale.append(internship)
+
+                if stale and not options["check"]:
+                    Internship.objects.bulk_update(stale, [*ROLLUP_FIELDS, "updated_at"])
+
+                stale_months = self.check_months([i.pk for i in batch])
+                months_drifted += len(stale_months)
+                if stale_months and not options["check"]:
+                    refresh_monthly_rollups(stale_months)
+
+        if options["check"] and (drifted or months_drifted):
+            raise CommandError(
+                f"{drifted} of {checked} internship rollups and the monthly rollups "
+                f"of {months_drifted} internships have drifted."
+            )
+
+        verb = "Found" if options["check"] else "Rebuilt"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {drifted} drifted rollups and {months_drifted} drifted monthly "
+                f"rollups across {checked} internships."
+            )
+        )
+
+    def check_months(self, internship_ids):
+        """
+        Returns the ids whose stored monthly rollups differ from their records.
+        """
+        expected = compute_monthly_rollups(internship_ids)
+        stored = {
+            (internship_id, month): tuple(values)
+            for internship_id, month, *values in MonthlyRollup.objects.filter(
+                internship_id__in=internship_ids
+            ).values_list("internship_id", "month", *ROLLUP_FIELDS)
+        }
+        # A month emptied through deltas keeps a row of zeros.
+        empty = (0.0, 0, 0, 0, 0)
+        stale = set()
+        for key in expected.keys() | stored.keys():
+            wanted, actual = expected.get(key, empty), stored.get(key, empty)
+            if wanted != actual:
+                self.stdout.write(
+                    f"Internship {key[0]}, {key[1]:%Y-%m}: stored {actual}, expected {wanted}"
+                )
+                stale.add(key[0])
+        return stale
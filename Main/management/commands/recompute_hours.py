@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Main.hours import total_hours
+from Main.models import DailyTimeRecord, refresh_rollups
+
+FIELDS = (
+    "pk",
+    "internship_id",
+    "date",
+    "am_in",
+    "am_out",
+    "pm_in",
+    "pm_out",
+    "is_holiday",
+    "is_weekend",
+    "is_absent",
+    "total_hours",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute total_hours for every time record from its punches and "
+        "store only the ones that changed, e.g. after a rounding rule change "
+        "or a fix made directly in SQL. Records are read in primary-key "
+        "chunks, so memory stays flat however many there are."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the records that would change without writing anything.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        dry_run = options["dry_run"]
+        records = DailyTimeRecord.objects.order_by("pk").values_list(*FIELDS)
+
+        checked = changed = 0
+        stale = set()
+        last_pk = 0
+        while True:
+            chunk = list(records.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            checked += len(chunk)
+
+            by_hours = defaultdict(list)
+            for pk, internship_id, day, am_in, am_out, pm_in, pm_out, *marks, stored in chunk:
+                hours = total_hours(am_in, am_out, pm_in, pm_out, marked=any(marks))
+                if hours == stored:
+                    continue
+                if dry_run:
+                    self.stdout.write(
+                        f"Record {pk} (internship {internship_id}, {day}): {stored} -> {hours}"
+                    )
+                stale.add(internship_id)
+                by_hours[hours].append(pk)
+                changed += 1
+
+            if by_hours and not dry_run:
+                # Hours only take half-hour values, so one UPDATE per distinct
+                # value beats bulk_update's per-row CASE by a wide margin.
+                now = timezone.now()
+                with transaction.atomic():
+                    for hours, pks in by_hours.items():
+                        DailyTimeRecord.objects.filter(pk__in=pks).update(
+                            total_hours=hours, updated_at=now
+                        )
+
+        if stale and not dry_run:
+            # Once for the whole run: each refresh rebuilds every monthly
+            # rollup of the internships it is given.
+            refresh_rollups(stale)
+
+        verb = "Would update" if dry_run else "Updated"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {changed} of {checked} time records.")
+        )
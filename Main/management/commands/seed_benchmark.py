@@ -0,0 +1,118 @@
+import random
+from datetime import time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Main.models import DailyTimeRecord, Internship, refresh_rollups
+
+
+def punch(rng, hour, spread=25):
+    # A clock time around `hour`, minutes jittered either way.
+    minutes = hour * 60 + rng.randint(-spread, spread)
+    return time(minutes // 60, minutes % 60)
+
+
+def fake_day(rng, internship, day):
+    """
+    One realistic DailyTimeRecord for `day`, or None for an unlogged day.
+    """
+    if day.weekday() >= 4:
+        # Fridays to Sundays are off; some interns mark them, most don't.
+        if rng.random() < 0.3:
+            return DailyTimeRecord(internship=internship, date=day, is_weekend=True)
+        return None
+
+    roll = rng.random()
+    if roll < 0.03:
+        return DailyTimeRecord(internship=internship, date=day, is_holiday=True)
+    if roll < 0.06:
+        return DailyTimeRecord(internship=internship, date=day, is_absent=True)
+    if roll < 0.08:
+        return None
+
+    record = DailyTimeRecord(
+        internship=internship,
+        date=day,
+        am_in=punch(rng, 8),
+        am_out=punch(rng, 12, 10),
+        pm_in=punch(rng, 13, 10),
+        pm_out=punch(rng, 18),
+    )
+    if roll < 0.12:
+        # Half days: the afternoon was never logged.
+        record.pm_in = record.pm_out = None
+    record.total_hours = record.compute_total_hours()
+    return record
+
+
+class Command(BaseCommand):
+    help = (
+        "Create N benchmark users, each with an internship and M days of "
+        "realistic time records. Run against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--days", type=int, default=180)
+        parser.add_argument("--prefix", default="bench")
+        parser.add_argument("--company", default="Benchmark Corp")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete existing users with the prefix first.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        today = timezone.localdate()
+        start_date = today - timedelta(days=options["days"])
+
+        if options["reset"]:
+            deleted, _ = User.objects.filter(username__startswith=f"{prefix}-").delete()
+            self.stdout.write(f"Deleted {deleted} existing benchmark objects.")
+
+        created_records = 0
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [
+                    User(username=f"{prefix}-{n:05d}", first_name="Bench", last_name=str(n))
+                    for n in range(options["users"])
+                ]
+            )
+            users = User.objects.filter(username__in=[u.username for u in users])
+            Internship.objects.bulk_create(
+                [
+                    Internship(
+                        user=user,
+                        company_name=options["company"],
+                        supervisor_name="Bench Supervisor",
+                        start_date=start_date,
+                        total_hours_required=rng.choice([300, 486, 600]),
+                    )
+                    for user in users
+                ]
+            )
+            internships = list(Internship.objects.filter(user__in=users))
+
+            for internship in internships:
+                records = []
+                # Stop before today so quick_log benchmarks start from a clean day.
+                for offset in range(options["days"]):
+                    record = fake_day(rng, internship, start_date + timedelta(days=offset))
+                    if record is not None:
+                        records.append(record)
+                DailyTimeRecord.objects.bulk_create(records, batch_size=1000)
+                created_records += len(records)
+
+            refresh_rollups(i.pk for i in internships)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(internships)} internships with {created_records} records."
+            )
+        )
@@ -0,0 +1,159 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+
+def _bucket_bounds(smallest, largest, factor):
+    bounds = []
+    value = smallest
+    while value < largest:
+        bounds.append(round(value, 3))
+        value *= factor
+    bounds.append(largest)
+    return bounds
+
+
+# Query counts are small integers, so they get exact buckets up to 30.
+QUERY_COUNT_BOUNDS = [*range(31), 40, 50, 75, 100, 200, 500, 1000, 10_000]
+
+
+class Histogram:
+    """
+    Fixed-size bucketed histogram (log-spaced by default): memory stays
+    constant however many values are recorded, and percentiles are accurate
+    to one bucket (~20%).
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = bounds or _bucket_bounds(0.25, 120_000, 1.2)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.total:
+            return 0.0
+        rank = pct / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # A bucket's upper bound can overshoot the largest value seen.
+                value = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                return round(value, 3)
+        return round(self.max, 3)
+
+    def summary(self):
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total, 3) if self.total else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": round(self.max, 3),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.wall_ms = Histogram()
+        self.db_ms = Histogram()
+        self.queries = Histogram(bounds=QUERY_COUNT_BOUNDS)
+        self.over_budget = 0
+        self.repeated_queries = 0
+
+
+class MetricsRegistry:
+    """
+    Per-process request metrics keyed by URL name, plus a short log of the
+    most recent requests that went over the query budget.
+    """
+
+    def __init__(self, slow_log_size=50):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.views = {}
+        self.flagged = deque(maxlen=slow_log_size)
+
+    def record(self, name, path, wall_ms, db_ms, queries, top_repeat, budget, repeat_threshold):
+        over_budget = queries > budget
+        repeated = top_repeat >= repeat_threshold
+        with self._lock:
+            metrics = self.views.get(name)
+            if metrics is None:
+                metrics = self.views[name] = ViewMetrics()
+            metrics.wall_ms.record(wall_ms)
+            metrics.db_ms.record(db_ms)
+            metrics.queries.record(queries)
+            metrics.over_budget += over_budget
+            metrics.repeated_queries += repeated
+            if over_budget or repeated:
+                self.flagged.append(
+                    {
+                        "view": name,
+                        "path": path,
+                        "at": time.time(),
+                        "queries": queries,
+                        "same_query_repeats": top_repeat,
+                        "wall_ms": round(wall_ms, 3),
+                    }
+                )
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "since": self.started,
+                "views": {
+                    name: {
+                        "wall_ms": m.wall_ms.summary(),
+                        "db_ms": m.db_ms.summary(),
+                        "queries": m.queries.summary(),
+                        "over_budget": m.over_budget,
+                        "repeated_queries": m.repeated_queries,
+                    }
+                    for name, m in sorted(self.views.items())
+                },
+                "flagged": list(self.flagged),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.views.clear()
+            self.flagged.clear()
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """
+    Connection execute_wrapper that counts and times every query, and notes
+    how often the same SQL was repeated (the N+1 signature).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql] += 1
+
+    @property
+    def top_repeat(self):
+        return max(self.shapes.values(), default=0)
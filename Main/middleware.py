@@ -0,0 +1,74 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import QueryTimer, registry
+
+
+def install_query_timer(timer):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+    return stack
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, database time and query count per URL name into the
+    in-process metrics registry. With METRICS_ENABLED off the middleware
+    removes itself at startup, so it costs nothing.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budget = settings.METRICS_QUERY_BUDGET
+        self.repeat_threshold = settings.METRICS_REPEAT_THRESHOLD
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with install_query_timer(timer):
+            response = self.get_response(request)
+        self.record(request, timer, started)
+        return response
+
+    async def __acall__(self, request):
+        # Database connections are per thread, and async ORM calls run on the
+        # request's sync thread, so the wrappers are installed from there.
+        timer = QueryTimer()
+        started = time.perf_counter()
+        stack = await sync_to_async(install_query_timer)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, timer, started)
+        return response
+
+    def record(self, request, timer, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        name = match.view_name if match else "<unresolved>"
+        registry.record(
+            name,
+            request.path,
+            wall_ms,
+            timer.elapsed * 1000,
+            timer.count,
+            timer.top_repeat,
+            self.budget,
+            self.repeat_threshold,
+        )
@@ -0,0 +1,69 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:48
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rollup(apps, schema_editor):
+    Internship = apps.get_model("Main", "Internship")
+    DailyTimeRecord = apps.get_model("Main", "DailyTimeRecord")
+
+    attended = Q(is_holiday=False, is_weekend=False) & (
+        Q(am_in__isnull=False, am_out__isnull=False)
+        | Q(pm_in__isnull=False, pm_out__isnull=False)
+    )
+    totals = (
+        DailyTimeRecord.objects.order_by()
+        .values("internship")
+        .annotate(
+            hours=Sum("total_hours"),
+            attended=Count("pk", filter=attended),
+            holidays=Count("pk", filter=Q(is_holiday=True)),
+            weekends=Count("pk", filter=Q(is_weekend=True)),
+            absences=Count("pk", filter=Q(is_absent=True)),
+        )
+    )
+    for row in totals:
+        Internship.objects.filter(pk=row["internship"]).update(
+            hours_logged=row["hours"] or 0,
+            days_attended=row["attended"],
+            holiday_count=row["holidays"],
+            weekend_count=row["weekends"],
+            absent_count=row["absences"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0005_dailytimerecord_is_absent'),
+    )
+
+    operations = (
+        migrations.AddField(
+            model_name='internship',
+            name='absent_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='internship',
+            name='days_attended',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='internship',
+            name='holiday_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='internship',
+            name='hours_logged',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='internship',
+            name='weekend_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    )
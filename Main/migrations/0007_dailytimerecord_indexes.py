@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0006_internship_rollup'),
+    )
+
+    operations = (
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(condition=models.Q(('is_holiday', True)), fields=['internship', 'date'], name='dtr_holiday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(condition=models.Q(('is_holiday', False), ('is_weekend', False), models.Q(models.Q(('am_in__isnull', False), ('am_out__isnull', False)), models.Q(('pm_in__isnull', False), ('pm_out__isnull', False)), _connector='OR')), fields=['internship', 'date'], name='dtr_attended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internship',
+            index=models.Index(fields=['company_name'], name='internship_company_idx'),
+        ),
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0007_dailytimerecord_indexes'),
+    )
+
+    operations = (
+        migrations.AddField(
+            model_name='dailytimerecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='internship',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    )
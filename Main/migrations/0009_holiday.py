@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0008_updated_at'),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=100)),
+                ('company_name', models.CharField(blank=True, help_text='Leave blank for a holiday that applies to every company', max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('date', 'company_name')},
+            },
+        ),
+    )
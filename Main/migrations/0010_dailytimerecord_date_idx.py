@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0009_holiday'),
+    )
+
+    operations = (
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(fields=['date'], name='dtr_date_idx'),
+        ),
+    )
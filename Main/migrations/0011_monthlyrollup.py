@@ -0,0 +1,71 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollup(apps, schema_editor):
+    DailyTimeRecord = apps.get_model("Main", "DailyTimeRecord")
+    MonthlyRollup = apps.get_model("Main", "MonthlyRollup")
+
+    attended = Q(is_holiday=False, is_weekend=False) & (
+        Q(am_in__isnull=False, am_out__isnull=False)
+        | Q(pm_in__isnull=False, pm_out__isnull=False)
+    )
+    totals = (
+        DailyTimeRecord.objects.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("internship", "month")
+        .annotate(
+            hours=Sum("total_hours"),
+            attended=Count("pk", filter=attended),
+            holidays=Count("pk", filter=Q(is_holiday=True)),
+            weekends=Count("pk", filter=Q(is_weekend=True)),
+            absences=Count("pk", filter=Q(is_absent=True)),
+        )
+    )
+    MonthlyRollup.objects.bulk_create(
+        (
+            MonthlyRollup(
+                internship_id=row["internship"],
+                month=row["month"],
+                hours_logged=row["hours"] or 0,
+                days_attended=row["attended"],
+                holiday_count=row["holidays"],
+                weekend_count=row["weekends"],
+                absent_count=row["absences"],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0010_dailytimerecord_date_idx'),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('hours_logged', models.FloatField(default=0)),
+                ('days_attended', models.PositiveIntegerField(default=0)),
+                ('holiday_count', models.PositiveIntegerField(default=0)),
+                ('weekend_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('internship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='Main.internship')),
+            ],
+            options={
+                'ordering': ['month'],
+                'unique_together': {('internship', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_monthly_rollup, migrations.RunPython.noop),
+    )
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0011_monthlyrollup'),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name='RecordTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('deleted_at', models.DateTimeField(auto_now=True)),
+                ('internship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='Main.internship')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['internship', 'deleted_at'], name='tombstone_sync_idx')],
+                'unique_together': {('internship', 'date')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(fields=['internship', 'updated_at'], name='dtr_sync_idx'),
+        ),
+    )
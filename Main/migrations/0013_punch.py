@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0012_record_tombstone'),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name='Punch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=64)),
+                ('action', models.CharField(max_length=6)),
+                ('punched_at', models.DateTimeField(help_text='Device time of the punch')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('error', models.CharField(blank=True, max_length=200)),
+                ('internship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='punches', to='Main.internship')),
+            ],
+            options={
+                'unique_together': {('internship', 'client_id')},
+            },
+        ),
+    )
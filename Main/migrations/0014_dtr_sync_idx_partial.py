@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0013_punch'),
+    )
+
+    operations = (
+        migrations.RemoveIndex(
+            model_name='dailytimerecord',
+            name='dtr_sync_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(condition=models.Q(('updated_at__isnull', False)), fields=['internship', 'updated_at'], name='dtr_sync_idx'),
+        ),
+    )
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0014_dtr_sync_idx_partial'),
+    )
+
+    operations = (
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    )
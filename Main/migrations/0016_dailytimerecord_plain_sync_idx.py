@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0015_monthlyrollup_updated_at'),
+    )
+
+    operations = (
+        migrations.RemoveIndex(
+            model_name='dailytimerecord',
+            name='dtr_attended_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='dailytimerecord',
+            name='dtr_sync_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerecord',
+            index=models.Index(fields=['internship', 'updated_at'], name='dtr_sync_idx'),
+        ),
+    )
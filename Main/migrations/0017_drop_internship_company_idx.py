@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = (
+        ('Main', '0016_dailytimerecord_plain_sync_idx'),
+    )
+
+    operations = (
+        migrations.RemoveIndex(
+            model_name='internship',
+            name='internship_company_idx',
+        ),
+    )
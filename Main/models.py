@@ -1,8 +1,47 @@
-from django.db import models
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from datetime import datetime, timedelta
-from django.db.models import Sum
 from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Aggregate, CharField, Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .hours import block_minutes, to_minutes, total_hours
+
+ROLLUP_FIELDS = (
+    "hours_logged",
+    "days_attended",
+    "holiday_count",
+    "weekend_count",
+    "absent_count",
+)
+
+# A day counts as attended when at least one AM or PM block is complete.
+ATTENDED_Q = Q(is_holiday=False, is_weekend=False) & (
+    Q(am_in__isnull=False, am_out__isnull=False)
+    | Q(pm_in__isnull=False, pm_out__isnull=False)
+)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+class GroupConcat(Aggregate):
+    """
+    Comma-joined values of an expression, e.g. every holiday date of an
+    internship alongside its other totals in a single aggregate query.
+    """
+
+    function = "GROUP_CONCAT"
+    output_field = CharField()
 
 
 class Internship(models.Model):
@@ -14,10 +53,51 @@ class Internship(models.Model):
     )
     supervisor_name = models.CharField(max_length=100, blank=True)
 
+    # Running totals over dailytimerecord_set, kept in step by DailyTimeRecord
+    # save()/delete() and rebuilt by the `rebuild_rollups` command.
+    hours_logged = models.FloatField(default=0)
+    days_attended = models.PositiveIntegerField(default=0)
+    holiday_count = models.PositiveIntegerField(default=0)
+    weekend_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+
+    # Moves whenever the internship or any of its records change; conditional
+    # GETs compare against it instead of rebuilding the page.
+    updated_at = models.DateTimeField(auto_now=True)
+
     @property
     def total_hours_logged(self):
-        result = self.dailytimerecord_set.aggregate(total=Sum("total_hours"))
-        return result["total"] or 0.0
+        return self.hours_logged
+
+    def apply_rollup_delta(self, delta):
+        """
+        Adds a (hours, attended, holidays, weekends, absences) delta to the
+        stored rollup and touches updated_at with a single UPDATE, mirroring
+        both on this instance.
+        """
+        changes = {
+            name: value for name, value in zip(ROLLUP_FIELDS, delta) if value
+        }
+        now = timezone.now()
+
+        Internship.objects.filter(pk=self.pk).update(
+            updated_at=now,
+            **{name: F(name) + value for name, value in changes.items()},
+        )
+        for name, value in changes.items():
+            setattr(self, name, getattr(self, name) + value)
+        self.updated_at = now
+
+    def save(self, *args, **kwargs):
+        # Rollup columns only move through apply_rollup_delta(), so saving a
+        # stale instance must not write them back over concurrent updates.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ROLLUP_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} @ {self.company_name}"
@@ -37,59 +117,124 @@ class DailyTimeRecord(models.Model):
     is_weekend = models.BooleanField(default=False)
     is_absent = models.BooleanField(default=False)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         unique_together = ("internship", "date")
         ordering = ["-date"]
+        indexes = (
+            # Partial indexes keep the holiday lookups and attendance counts
+            # from walking every record an intern has ever logged.
+            models.Index(
+                fields=["internship", "date"],
+                condition=Q(is_holiday=True),
+                name="dtr_holiday_idx",
+            ),
+            # Default ordering and the admin's date drill-down across everyone.
+            models.Index(fields=["date"], name="dtr_date_idx"),
+            # Delta sync: an intern's records changed since a cursor.
+            models.Index(fields=["internship", "updated_at"], name="dtr_sync_idx"),
+        )
 
     def __str__(self):
         return f"{self.internship.user.username} - {self.date}"
 
-    def round_up_30(self, t):
-        if not t:
-            return None
-
-        dt = datetime.combine(self.date, t)
-
-        remainder = dt.minute % 30
-        if remainder != 0:
-            dt += timedelta(minutes=(30 - remainder))
-
-        # zero out seconds
-        dt = dt.replace(second=0, microsecond=0)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Reading a deferred field here would load it through from_db again;
+        # such instances read their stored row on save or delete instead.
+        if not instance.get_deferred_fields():
+            instance._take_snapshot()
+        return instance
+
+    def _take_snapshot(self):
+        # What the stored row counts for, so a save or delete can move the
+        # rollups by the difference.
+        self._rollup_snapshot = (
+            (self.internship_id, month_start(self.date)),
+            self.rollup_contribution(),
+        )
+        self._stored_day = (self.internship_id, self.date)
+
+    def _load_snapshot(self):
+        if hasattr(self, "_rollup_snapshot") or self._state.adding:
+            return
+        stored = DailyTimeRecord.objects.filter(pk=self.pk).first()
+        if stored is not None:
+            self._rollup_snapshot = stored._rollup_snapshot
+            self._stored_day = stored._stored_day
 
-        return dt.time()
-
-    def round_down_30(self, t):
-        if not t:
-            return None
-
-        dt = datetime.combine(self.date, t)
-
-        remainder = dt.minute % 30
-        dt -= timedelta(minutes=remainder)
-
-        # zero out seconds
-        dt = dt.replace(second=0, microsecond=0)
-
-        return dt.time()
+    @property
+    def is_attended(self):
+        if self.is_holiday or self.is_weekend:
+            return False
+        return bool(
+            (self.am_in and self.am_out) or (self.pm_in and self.pm_out)
+        )
+
+    def rollup_contribution(self):
+        """
+        What this record adds to its internship's rollup, in ROLLUP_FIELDS order.
+        """
+        return (
+            self.total_hours,
+            int(self.is_attended),
+            int(self.is_holiday),
+            int(self.is_weekend),
+            int(self.is_absent),
+        )
+
+    def _rollup_target(self, internship_id):
+        # Reuse the cached internship so callers see the new totals without
+        # an extra query; otherwise a bare instance is enough to issue the UPDATE.
+        if internship_id == self.internship_id and DailyTimeRecord.internship.is_cached(self):
+            return self.internship
+        return Internship(pk=internship_id)
+
+    def _update_rollup(self, new):
+        old_key, old = getattr(self, "_rollup_snapshot", (None, None))
+        new_key = (self.internship_id, month_start(self.date)) if new is not None else None
+        old_internship_id = old_key[0] if old_key else None
+        new_internship_id = new_key[0] if new_key else None
+
+        if old_internship_id == new_internship_id:
+            delta = tuple(n - o for n, o in zip(new or (0,) * 5, old or (0,) * 5))
+            self._rollup_target(new_internship_id).apply_rollup_delta(delta)
+        else:
+            if old_internship_id is not None:
+                self._rollup_target(old_internship_id).apply_rollup_delta(
+                    tuple(-o for o in old)
+                )
+            if new_internship_id is not None:
+                self._rollup_target(new_internship_id).apply_rollup_delta(new)
+
+        # The same change per month: a moved record leaves one month and
+        # joins another.
+        monthly = defaultdict(lambda: defaultdict(lambda: [0] * 5))
+        if old_key is not None:
+            for i, o in enumerate(old):
+                monthly[old_key[0]][old_key[1]][i] -= o
+        if new_key is not None:
+            for i, n in enumerate(new):
+                monthly[new_key[0]][new_key[1]][i] += n
+        for internship_id, deltas in monthly.items():
+            apply_monthly_deltas(internship_id, deltas)
+
+        self._rollup_snapshot = (new_key, new)
 
     def calculate_block(self, time_in, time_out):
-        # If either is missing, block is incomplete → return 0
-        if not time_in or not time_out:
-            return 0
-
-        # Round times
-        time_in = self.round_up_30(time_in)
-        time_out = self.round_down_30(time_out)
-
-        # If after rounding, block is invalid → 0
-        if time_out <= time_in:
-            return 0
-
-        dt_in = datetime.combine(self.date, time_in)
-        dt_out = datetime.combine(self.date, time_out)
-        diff = dt_out - dt_in
-        return diff.total_seconds() / 3600
+        # Hours for one in/out pair; incomplete or empty blocks count as 0.
+        return block_minutes(to_minutes(time_in), to_minutes(time_out)) / 60
+
+    def compute_total_hours(self):
+        return total_hours(
+            self.am_in,
+            self.am_out,
+            self.pm_in,
+            self.pm_out,
+            marked=self.is_weekend or self.is_holiday or self.is_absent,
+        )
 
     def clean(self):
         errors = {}
@@ -109,11 +254,302 @@ class DailyTimeRecord(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
 
-        if self.is_weekend or self.is_holiday or self.is_absent:
-            self.total_hours = 0
-        else:
-            am_hours = self.calculate_block(self.am_in, self.am_out)
-            pm_hours = self.calculate_block(self.pm_in, self.pm_out)
-            self.total_hours = am_hours + pm_hours
+        self.total_hours = self.compute_total_hours()
+
+        with transaction.atomic():
+            self._load_snapshot()
+            super().save(*args, **kwargs)
+            # Moving a record to another day or internship deletes it there.
+            stored = getattr(self, "_stored_day", None)
+            if stored is not None and stored != (self.internship_id, self.date):
+                record_tombstones(stored[0], [stored[1]])
+            self._update_rollup(self.rollup_contribution())
+        self._stored_day = (self.internship_id, self.date)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self._load_snapshot()
+            internship_id, day = getattr(self, "_stored_day", (self.internship_id, self.date))
+            result = super().delete(*args, **kwargs)
+            record_tombstones(internship_id, [day])
+            self._update_rollup(None)
+        return result
+
+
+class MonthlyRollup(models.Model):
+    """
+    One internship's rollup (ROLLUP_FIELDS) for one calendar month, kept in
+    step with its records like the Internship totals, so finished months are
+    read back instead of re-aggregated.
+    """
+
+    internship = models.ForeignKey(
+        "Internship", on_delete=models.CASCADE, related_name="monthly_rollups"
+    )
+    month = models.DateField(help_text="First day of the month")
 
-        super().save(*args, **kwargs)
+    hours_logged = models.FloatField(default=0)
+    days_attended = models.PositiveIntegerField(default=0)
+    holiday_count = models.PositiveIntegerField(default=0)
+    weekend_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+
+    # Moves whenever a record of the month changes, even when the totals
+    # don't, so it versions the month's cached calendar (month_data_version).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("internship", "month")
+        ordering = ["month"]
+
+    def __str__(self):
+        return f"{self.internship_id} {self.month:%Y-%m}"
+
+
+class RecordTombstone(models.Model):
+    """
+    A day whose DailyTimeRecord was deleted (or moved away), so clients
+    syncing with a `since` cursor learn to drop it. Kept for
+    SYNC_TOMBSTONE_DAYS; older cursors get a full sync instead.
+    """
+
+    internship = models.ForeignKey(
+        "Internship", on_delete=models.CASCADE, related_name="tombstones"
+    )
+    date = models.DateField()
+    deleted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("internship", "date")
+        indexes = (
+            models.Index(fields=["internship", "deleted_at"], name="tombstone_sync_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.internship_id} {self.date} (deleted)"
+
+
+class Punch(models.Model):
+    """
+    A quick-log punch sent by a client's offline queue, stored under the
+    client's own ID with its outcome so a replayed batch changes nothing.
+    An empty `error` means the punch was applied.
+    """
+
+    internship = models.ForeignKey(
+        "Internship", on_delete=models.CASCADE, related_name="punches"
+    )
+    client_id = models.CharField(max_length=64)
+    action = models.CharField(max_length=6)
+    punched_at = models.DateTimeField(help_text="Device time of the punch")
+    received_at = models.DateTimeField(auto_now_add=True)
+    error = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        unique_together = ("internship", "client_id")
+
+    def __str__(self):
+        return f"{self.internship_id} {self.action} @ {self.punched_at}"
+
+
+class Holiday(models.Model):
+    """
+    A day off shared by every intern, or by every intern of one company.
+    An intern's own DailyTimeRecord for the date takes precedence.
+    """
+
+    date = models.DateField()
+    name = models.CharField(max_length=100)
+    company_name = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Leave blank for a holiday that applies to every company",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("date", "company_name")
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date}, {self.company_name or 'all companies'})"
+
+
+def rollup_aggregates():
+    return {
+        "hours": Sum("total_hours"),
+        "attended": Count("pk", filter=ATTENDED_Q),
+        "holidays": Count("pk", filter=Q(is_holiday=True)),
+        "weekends": Count("pk", filter=Q(is_weekend=True)),
+        "absences": Count("pk", filter=Q(is_absent=True)),
+    }
+
+
+def rollup_values(row):
+    return (
+        row["hours"] or 0.0,
+        row["attended"],
+        row["holidays"],
+        row["weekends"],
+        row["absences"],
+    )
+
+
+def compute_rollups(internship_ids=None):
+    """
+    Returns {internship_id: rollup tuple} recomputed from the raw records in
+    one grouped query. Internships without records are simply absent.
+    """
+    records = DailyTimeRecord.objects.order_by()
+    if internship_ids is not None:
+        records = records.filter(internship_id__in=internship_ids)
+
+    totals = records.values("internship").annotate(**rollup_aggregates())
+    return {row["internship"]: rollup_values(row) for row in totals}
+
+
+def compute_monthly_rollups(internship_ids, months=None):
+    """
+    Returns {(internship_id, month): rollup tuple} recomputed from the raw
+    records in one grouped query, optionally only for the given months.
+    """
+    records = DailyTimeRecord.objects.order_by().filter(internship_id__in=internship_ids)
+    if months is not None:
+        months = set(months)
+        # One date range (an index range) covering them all; months in
+        # between are dropped below.
+        records = records.filter(date__gte=min(months), date__lt=next_month(max(months)))
+
+    totals = (
+        records.annotate(month=TruncMonth("date"))
+        .values("internship", "month")
+        .annotate(**rollup_aggregates())
+    )
+    return {
+        (row["internship"], row["month"]): rollup_values(row)
+        for row in totals
+        if months is None or row["month"] in months
+    }
+
+
+def apply_monthly_deltas(internship_id, deltas):
+    """
+    Adds {month: delta} (in ROLLUP_FIELDS order) to an internship's monthly
+    rollups and touches their updated_at, with one UPDATE per month; a zero
+    delta still marks the month as changed. A month that has no row yet is
+    computed from its records and inserted instead.
+    """
+    now = timezone.now()
+    missing = []
+    for month, delta in deltas.items():
+        changes = {
+            name: F(name) + value for name, value in zip(ROLLUP_FIELDS, delta) if value
+        }
+        updated = MonthlyRollup.objects.filter(
+            internship_id=internship_id, month=month
+        ).update(updated_at=now, **changes)
+        if not updated:
+            missing.append(month)
+    if missing:
+        # Nothing to delete first, unlike refresh_monthly_rollups: these
+        # months have no row.
+        store_monthly_rollups(compute_monthly_rollups([internship_id], missing))
+
+
+def refresh_monthly_rollups(internship_ids, months=None):
+    """
+    Recomputes and stores the monthly rollups of the given internships (all
+    months, or only `months`), dropping months left without records.
+    """
+    internship_ids = set(internship_ids)
+    expected = compute_monthly_rollups(internship_ids, months)
+    with transaction.atomic():
+        stale = MonthlyRollup.objects.filter(internship_id__in=internship_ids)
+        if months is not None:
+            stale = stale.filter(month__in=months)
+        stale.delete()
+        store_monthly_rollups(expected)
+
+
+def store_monthly_rollups(rollups):
+    """
+    Stores {(internship_id, month): values} (see compute_monthly_rollups)
+    in one statement. An upsert, so a concurrent first write to the same
+    month can't make this fail.
+    """
+    MonthlyRollup.objects.bulk_create(
+        [
+            MonthlyRollup(
+                internship_id=internship_id,
+                month=month,
+                **dict(zip(ROLLUP_FIELDS, values)),
+            )
+            for (internship_id, month), values in rollups.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["internship", "month"],
+        update_fields=[*ROLLUP_FIELDS, "updated_at"],
+    )
+
+
+def month_data_version(internship_id, month):
+    """
+    A version of an internship's records in one month: its MonthlyRollup's
+    updated_at, which every write to the month moves in the same
+    transaction. Being stored, it is the same in every process.
+    """
+    updated_at = (
+        MonthlyRollup.objects.filter(internship_id=internship_id, month=month)
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+    return updated_at.timestamp() if updated_at else 0
+
+
+async def amonth_data_version(internship_id, month):
+    updated_at = await (
+        MonthlyRollup.objects.filter(internship_id=internship_id, month=month)
+        .values_list("updated_at", flat=True)
+        .afirst()
+    )
+    return updated_at.timestamp() if updated_at else 0
+
+
+def record_tombstones(internship_id, days):
+    """
+    Marks the given days of an internship as deleted for delta sync, and
+    drops its tombstones that are past SYNC_TOMBSTONE_DAYS.
+    """
+    if not days:
+        return
+    now = timezone.now()
+    RecordTombstone.objects.bulk_create(
+        [RecordTombstone(internship_id=internship_id, date=day) for day in days],
+        update_conflicts=True,
+        unique_fields=["internship", "date"],
+        update_fields=["deleted_at"],
+    )
+    RecordTombstone.objects.filter(
+        internship_id=internship_id,
+        deleted_at__lt=now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS),
+    ).delete()
+
+
+def refresh_rollups(internship_ids):
+    """
+    Recomputes and stores the rollup and monthly rollups of the given
+    internships, for bulk writes that bypass DailyTimeRecord.save().
+    """
+    internship_ids = set(internship_ids)
+    expected = compute_rollups(internship_ids)
+    internships = list(
+        Internship.objects.filter(pk__in=internship_ids).only("pk", *ROLLUP_FIELDS)
+    )
+    now = timezone.now()
+    for internship in internships:
+        values = expected.get(internship.pk, (0.0, 0, 0, 0, 0))
+        for name, value in zip(ROLLUP_FIELDS, values):
+            setattr(internship, name, value)
+        internship.updated_at = now
+    Internship.objects.bulk_update(internships, [*ROLLUP_FIELDS, "updated_at"])
+    refresh_monthly_rollups(internship_ids)
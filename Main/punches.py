@@ -0,0 +1,232 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .dtr_writes import RecordChanged, read_day, record_values, write_day
+from .holidays import holiday_calendar
+from .models import DailyTimeRecord, Internship, Punch
+
+PUNCH_ACTIONS = ("am_in", "am_out", "pm_in", "pm_out")
+# Device clocks run a little fast; punches further ahead than this are refused.
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+ALREADY_LOGGED = "Already logged."
+LOST_RACE = "Today's record changed at the same moment (another tab or a double click), so this punch was not recorded."
+
+
+def next_quick_log_action(today_record, shared_holiday=False):
+    """
+    Returns the next punch for today given its record (None if nothing logged)
+    and whether today is a shared holiday
+    """
+    if not today_record:
+        return None if shared_holiday else "am_in"
+
+    if (
+        today_record.is_holiday or today_record.is_weekend or today_record.is_absent
+    ):  # ADD is_absent
+        return None
+
+    if not today_record.am_in:
+        return "am_in"
+    if not today_record.am_out:
+        return "am_out"
+    if not today_record.pm_in:
+        return "pm_in"
+    if not today_record.pm_out:
+        return "pm_out"
+
+    return None
+
+
+def quick_log_error(action, existing, shared_holiday=False):
+    """
+    Returns why `action` can't be logged now against today's record, or None
+    """
+    if existing and (existing.is_holiday or existing.is_weekend or existing.is_absent):
+        return "Cannot log time on a holiday, weekend, or absent day."
+    if not existing and shared_holiday:
+        return "Cannot log time on a holiday, weekend, or absent day."
+    if existing and action in PUNCH_ACTIONS and getattr(existing, action):
+        return ALREADY_LOGGED
+    expected_action = next_quick_log_action(existing, shared_holiday)
+    if action != expected_action or expected_action is None:
+        return "Invalid log action."
+    return None
+
+
+def log_punch(internship, action, moment):
+    """
+    Logs `action` at `moment` (local time) if it is the next punch of that
+    day, returning why not otherwise (None when logged).
+
+    Two punches for the same step can both pass the check, e.g. a double
+    click or two tabs, but the write only lands while the step is still
+    open (see write_day), so the slower one is turned away instead of
+    overwriting the first.
+    """
+    day = moment.date()
+    existing = read_day(internship, day)
+    shared = existing is None and holiday_calendar.is_holiday(internship.company_name, day)
+    error = quick_log_error(action, existing, shared)
+    if error:
+        return error
+
+    try:
+        write_day(internship, day, existing, record_values(existing) | {action: moment.time()})
+    except ValidationError:
+        return "Invalid log action."
+    except RecordChanged:
+        return LOST_RACE
+    return None
+
+
+def punch_cutoff(now):
+    """
+    Punches from before this are neither applied nor kept: their stored
+    results are pruned, so a replay could not be recognised.
+    """
+    return now - timedelta(days=settings.PUNCH_RETENTION_DAYS)
+
+
+def parse_punch(data, now):
+    """
+    Returns (client id, action, local device time) for one queued punch.
+    Raises ValidationError when it can't be applied or deduplicated.
+    """
+    client_id = data.get("id")
+    if not isinstance(client_id, str) or not 0 < len(client_id) <= 64:
+        raise ValidationError("Each punch needs an id of up to 64 characters.")
+
+    action = data.get("action")
+    if action not in PUNCH_ACTIONS:
+        raise ValidationError(f"Expected one of {', '.join(PUNCH_ACTIONS)}.")
+
+    try:
+        moment = parse_datetime(data.get("at") or "")
+    except (TypeError, ValueError):
+        moment = None
+    if moment is None:
+        raise ValidationError("Invalid punch time.")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    if moment > now + MAX_CLOCK_SKEW:
+        raise ValidationError("Punch time is in the future.")
+    if moment < punch_cutoff(now):
+        raise ValidationError("Punch is too old to apply.")
+    return client_id, action, timezone.localtime(moment)
+
+
+def punch_result(punch, duplicate=False):
+    result = {
+        "id": punch.client_id,
+        "ok": not punch.error,
+        "date": timezone.localtime(punch.punched_at).date().isoformat(),
+        "action": punch.action,
+        "duplicate": duplicate,
+    }
+    if punch.error:
+        result["error"] = punch.error
+    return result
+
+
+def apply_punches(internship, punches):
+    """
+    Applies queued quick-log punches in order in one transaction, each
+    checked like a quick log made at its device time. Punches whose ID was
+    seen before are not applied again; their stored result is returned.
+    The internship's punches past PUNCH_RETENTION_DAYS are dropped.
+
+    Returns (one result per punch, {date: record} for the days touched).
+    Every changed day is written once through write_day, however many
+    punches it took; if the day changed meanwhile (e.g. a quick log from
+    another tab) it is left alone and its punches fail with LOST_RACE.
+    """
+    now = timezone.now()
+    results = [None] * len(punches)
+    parsed = []
+    for index, data in enumerate(punches):
+        try:
+            parsed.append((index, *parse_punch(data, now)))
+        except ValidationError as e:
+            results[index] = {"id": data.get("id"), "ok": False, "error": e.messages[0]}
+
+    with transaction.atomic():
+        # Writing first takes SQLite's write lock (a row lock elsewhere)
+        # before anything is read: a retry racing the original flush waits
+        # here, then sees its punches, and a transaction that read first
+        # can't fail to upgrade with "database is locked".
+        Internship.objects.filter(pk=internship.pk).update(updated_at=F("updated_at"))
+        Punch.objects.filter(internship=internship, punched_at__lt=punch_cutoff(now)).delete()
+
+        seen = {
+            punch.client_id: punch
+            for punch in Punch.objects.filter(
+                internship=internship, client_id__in=[client_id for _, client_id, _, _ in parsed]
+            )
+        }
+        records = {
+            record.date: record
+            for record in DailyTimeRecord.objects.filter(
+                internship=internship, date__in={moment.date() for *_, moment in parsed}
+            )
+        }
+
+        # What each changed day will hold, and the punches that changed it.
+        changed = {}
+        applied = defaultdict(list)
+        new_punches = []
+        for index, client_id, action, moment in parsed:
+            if client_id in seen:
+                results[index] = punch_result(seen[client_id], duplicate=True)
+                continue
+
+            day = moment.date()
+            existing = changed.get(day, records.get(day))
+            shared = existing is None and holiday_calendar.is_holiday(
+                internship.company_name, day
+            )
+            error = quick_log_error(action, existing, shared)
+            if error is None:
+                record = DailyTimeRecord(
+                    internship=internship,
+                    date=day,
+                    **record_values(existing) | {action: moment.time()},
+                )
+                try:
+                    record.clean()
+                except ValidationError:
+                    error = "Invalid log action."
+                else:
+                    changed[day] = record
+
+            punch = Punch(
+                internship=internship,
+                client_id=client_id,
+                action=action,
+                punched_at=moment,
+                error=error or "",
+            )
+            if error is None:
+                applied[day].append((index, punch))
+            seen[client_id] = punch
+            new_punches.append(punch)
+            results[index] = punch_result(punch)
+
+        for day, record in changed.items():
+            try:
+                records[day] = write_day(internship, day, records.get(day), record_values(record))
+            except RecordChanged:
+                records[day] = read_day(internship, day)
+                for index, punch in applied[day]:
+                    punch.error = LOST_RACE
+                    results[index] = punch_result(punch)
+        Punch.objects.bulk_create(new_punches)
+
+    return results, records
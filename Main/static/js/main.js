@@ -42,6 +42,7 @@ async function openModal(row) {
         document.getElementById(id).disabled = disableForm;
     });
     document.querySelector('button[form="daily-log-form"]').disabled = disableForm;
+    document.getElementById('modal-whole-week').checked = false;
 
     const holidayBtn = document.getElementById('holiday-btn');
     const weekendBtn = document.getElementById('weekend-btn');
@@ -78,6 +79,251 @@ function closeModal() {
     }
 }
 
+async function submitDayBatch(operations) {
+    const form = document.getElementById('daily-log-form');
+    const response = await fetch(form.dataset.batchUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': form.querySelector('[name="csrfmiddlewaretoken"]').value,
+        },
+        body: JSON.stringify({ operations }),
+    });
+    if (!response.ok) throw new Error('Failed to save days');
+    return (await response.json()).results;
+}
+
+function toISODate(d) {
+    const month = String(d.getMonth() + 1).padStart(2, '0');
+    const day = String(d.getDate()).padStart(2, '0');
+    return `${d.getFullYear()}-${month}-${day}`;
+}
+
+async function saveWholeWeek(event) {
+    if (!document.getElementById('modal-whole-week').checked) return;
+    event.preventDefault();
+
+    const form = event.target;
+    const month = form.elements.month.value;
+    const year = form.elements.year.value;
+    const picked = new Date(year, month - 1, form.elements.day.value);
+    const monday = new Date(picked);
+    monday.setDate(picked.getDate() - ((picked.getDay() + 6) % 7));
+
+    const operations = [0, 1, 2, 3].map(offset => {
+        const d = new Date(monday);
+        d.setDate(monday.getDate() + offset);
+        return {
+            date: toISODate(d),
+            action: 'set',
+            am_in: form.elements.am_in.value,
+            am_out: form.elements.am_out.value,
+            pm_in: form.elements.pm_in.value,
+            pm_out: form.elements.pm_out.value,
+        };
+    });
+
+    try {
+        const results = await submitDayBatch(operations);
+        const failed = results.filter(result => !result.ok);
+        if (failed.length) {
+            alert(`Could not save ${failed.map(result => result.date).join(', ')}. Please check the time order.`);
+        }
+    } catch (error) {
+        console.error('Error saving week:', error);
+        return;
+    }
+
+    // One reload for the whole week instead of one redirect per day
+    window.location.href = `?month=${month}&year=${year}`;
+}
+
+// Months already fetched from the server, keyed by "year-month"
+const monthCache = new Map();
+
+function renderMonth(payload) {
+    const tbody = document.getElementById('month-rows');
+    const rows = [];
+
+    for (let i = 0; i < payload.days; i++) {
+        const day = i + 1;
+        const tr = document.createElement('tr');
+        tr.className = 'hover:bg-orange-200 cursor-pointer';
+        tr.dataset.day = day;
+        tr.dataset.month = payload.month;
+        tr.dataset.year = payload.year;
+        tr.onclick = () => openModal(tr);
+
+        const dayCell = document.createElement('td');
+        dayCell.className = 'font-semibold';
+        dayCell.textContent = day;
+        tr.appendChild(dayCell);
+
+        const mark = payload.mark[i];
+        if (mark) {
+            const cell = document.createElement('td');
+            cell.colSpan = 5;
+            cell.className = 'text-center font-bold';
+            cell.textContent = mark.toUpperCase();
+            tr.appendChild(cell);
+        } else {
+            ['am_in', 'am_out', 'pm_in', 'pm_out'].forEach(field => {
+                const cell = document.createElement('td');
+                cell.textContent = payload[field][i] || '-';
+                tr.appendChild(cell);
+            });
+            const hoursCell = document.createElement('td');
+            hoursCell.className = 'font-semibold';
+            hoursCell.textContent = payload.hours[i] ? String(payload.hours[i]) : '-';
+            tr.appendChild(hoursCell);
+        }
+        rows.push(tr);
+    }
+
+    tbody.replaceChildren(...rows);
+    document.getElementById('month-label').textContent = payload.label;
+}
+
+async function showMonth(month, year) {
+    const calendar = document.querySelector('[data-month-url]');
+    const key = `${year}-${month}`;
+
+    let payload = monthCache.get(key);
+    if (!payload) {
+        try {
+            const response = await fetch(`${calendar.dataset.monthUrl}?month=${month}&year=${year}`);
+            if (!response.ok) throw new Error('Failed to fetch month');
+            payload = await response.json();
+        } catch (error) {
+            console.error('Error fetching month:', error);
+            return false;
+        }
+        monthCache.set(key, payload);
+    }
+
+    renderMonth(payload);
+    calendar.dataset.month = month;
+    calendar.dataset.year = year;
+
+    // Keep links and post-redirect targets pointing at the visible month
+    calendar.querySelectorAll('[data-month-step]').forEach(link => {
+        const target = new Date(year, month - 1 + Number(link.dataset.monthStep), 1);
+        link.href = `?month=${target.getMonth() + 1}&year=${target.getFullYear()}`;
+    });
+    document.querySelectorAll('input[name="redirect_month"]').forEach(input => input.value = month);
+    document.querySelectorAll('input[name="redirect_year"]').forEach(input => input.value = year);
+    return true;
+}
+
+// Quick-log punches not yet confirmed by the server, oldest first. Each
+// keeps the ID and device time it was made with, so a lost response or a
+// repeated flush never logs it twice.
+const PUNCH_BATCH_SIZE = 100;
+const PUNCH_RETRY_MS = 30000;
+// Clicks closer together than this are one punch (double clicks).
+const PUNCH_DEBOUNCE_MS = 2000;
+const NEXT_PUNCH = { am_in: 'am_out', am_out: 'pm_in', pm_in: 'pm_out', pm_out: '' };
+const PUNCH_LABELS = {
+    am_in: 'Time In (AM)',
+    am_out: 'Time Out (AM)',
+    pm_in: 'Time In (PM)',
+    pm_out: 'Time Out (PM)',
+    '': 'No more actions for today',
+};
+let flushingPunches = false;
+let lastPunchAt = 0;
+
+function loadPunchQueue(form) {
+    try {
+        return JSON.parse(localStorage.getItem(form.dataset.queueKey)) || [];
+    } catch (error) {
+        return [];
+    }
+}
+
+function savePunchQueue(form, queue) {
+    localStorage.setItem(form.dataset.queueKey, JSON.stringify(queue));
+}
+
+function newPunchId() {
+    // randomUUID is only available on secure (HTTPS) pages
+    if (window.crypto?.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+function showNextPunch(form, action, label) {
+    form.elements.log_action.value = action || '';
+    form.querySelector('[data-action-label]').value = label;
+    form.querySelector('button[type="submit"]').disabled = !action;
+}
+
+function queuePunch(event) {
+    event.preventDefault();
+    const form = event.target;
+    const action = form.elements.log_action.value;
+    const now = Date.now();
+    if (!action || now - lastPunchAt < PUNCH_DEBOUNCE_MS) return;
+    lastPunchAt = now;
+
+    const queue = loadPunchQueue(form);
+    queue.push({ id: newPunchId(), action, at: new Date(now).toISOString() });
+    savePunchQueue(form, queue);
+
+    // Offline, the next punch has to be available before the server answers
+    const next = NEXT_PUNCH[action];
+    showNextPunch(form, next, PUNCH_LABELS[next]);
+    flushPunches();
+}
+
+async function flushPunches() {
+    const form = document.getElementById('quick-log-form');
+    if (!form || flushingPunches) return;
+    const batch = loadPunchQueue(form).slice(0, PUNCH_BATCH_SIZE);
+    if (!batch.length) return;
+
+    flushingPunches = true;
+    let data;
+    try {
+        const response = await fetch(form.dataset.punchUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': form.querySelector('[name="csrfmiddlewaretoken"]').value,
+            },
+            body: JSON.stringify({ punches: batch }),
+        });
+        if (!response.ok) throw new Error('Failed to send punches');
+        data = await response.json();
+    } catch (error) {
+        // Offline or unreachable: the queue is kept for the next attempt
+        console.error('Error sending punches:', error);
+        return;
+    } finally {
+        flushingPunches = false;
+    }
+
+    const sent = new Set(batch.map(punch => punch.id));
+    const remaining = loadPunchQueue(form).filter(punch => !sent.has(punch.id));
+    savePunchQueue(form, remaining);
+
+    const failed = data.results.filter(result => !result.ok && !result.duplicate);
+    if (failed.length) {
+        alert(failed.map(result => `${result.date || ''} ${result.action || ''}: ${result.error}`).join('\n'));
+    }
+
+    if (remaining.length) {
+        flushPunches();
+        return;
+    }
+    showNextPunch(form, data.next_action, data.next_action_label);
+
+    const calendar = document.querySelector('[data-month-url]');
+    if (calendar) {
+        monthCache.clear();
+        showMonth(Number(calendar.dataset.month), Number(calendar.dataset.year));
+    }
+}
+
 function getOrdinal(n) {
     if (n >= 11 && n <= 13) return n + 'th';
     switch (n % 10) {
@@ -95,6 +341,39 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     });
 
+    document.getElementById('daily-log-form')?.addEventListener('submit', saveWholeWeek);
+
+    if (document.getElementById('quick-log-form')) {
+        document.getElementById('quick-log-form').addEventListener('submit', queuePunch);
+        window.addEventListener('online', flushPunches);
+        setInterval(flushPunches, PUNCH_RETRY_MS);
+        flushPunches();
+    }
+
+    const calendar = document.querySelector('[data-month-url]');
+    if (calendar) {
+        calendar.querySelectorAll('[data-month-step]').forEach(link => {
+            link.addEventListener('click', async event => {
+                event.preventDefault();
+                const current = new Date(calendar.dataset.year, calendar.dataset.month - 1 + Number(link.dataset.monthStep), 1);
+                const month = current.getMonth() + 1;
+                const year = current.getFullYear();
+                if (await showMonth(month, year)) {
+                    history.pushState({ month, year }, '', `?month=${month}&year=${year}`);
+                } else {
+                    window.location.href = link.href;
+                }
+            });
+        });
+
+        window.addEventListener('popstate', event => {
+            if (event.state) showMonth(event.state.month, event.state.year);
+        });
+        history.replaceState(
+            { month: Number(calendar.dataset.month), year: Number(calendar.dataset.year) }, ''
+        );
+    }
+
     const dateInput = document.querySelector('input[name="log_date"]');
     const timeInput = document.querySelector('input[name="log_time"]');
 
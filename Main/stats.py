@@ -0,0 +1,314 @@
+import math
+from bisect import bisect_left
+from calendar import monthrange
+from collections import namedtuple
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .holidays import filter_company, holiday_calendar
+from .models import (
+    ATTENDED_Q,
+    ROLLUP_FIELDS,
+    DailyTimeRecord,
+    GroupConcat,
+    Internship,
+    MonthlyRollup,
+    compute_monthly_rollups,
+    month_start,
+    next_month,
+)
+from .workdays import WorkdayCalendar
+
+
+def stats_filters(scope, today, shared_holidays, start):
+    """
+    Returns the record filter and aggregate expressions behind the dashboard
+    stats for the internships matched by `scope` (a Q on the records).
+    Holidays before `start` are left out; the workday counts begin there.
+    """
+    _, last_day = monthrange(today.year, today.month)
+    this_month = Q(
+        date__gte=today.replace(day=1),
+        date__lte=today.replace(day=last_day),
+        is_holiday=False,
+        is_weekend=False,
+    )
+
+    # Overall totals come from the stored rollup; everything else the page
+    # needs is gathered in one conditional aggregate over the records. Each
+    # branch of the OR is an index range of its own (the holiday partial
+    # index from `start`, then this month's dates), so the intern's history
+    # is not scanned.
+    branches = (scope & Q(is_holiday=True, date__gte=start)) | (scope & this_month)
+    aggregates = {
+        "hours_this_month": Sum("total_hours", filter=this_month),
+        "days_attended_this_month": Count("pk", filter=this_month & ATTENDED_Q),
+        "holiday_dates": GroupConcat("date", filter=Q(is_holiday=True)),
+    }
+    if shared_holidays:
+        # The intern's own record on a shared holiday overrides it.
+        branches |= scope & Q(date__in=shared_holidays)
+        aggregates["overridden_dates"] = GroupConcat(
+            "date", filter=Q(date__in=shared_holidays, is_holiday=False)
+        )
+    return branches, aggregates
+
+
+def stats_totals_query(internship, today, shared_holidays):
+    """
+    Returns the queryset and aggregate expressions behind the dashboard stats,
+    so the sync and async paths issue the same single query
+    """
+    branches, aggregates = stats_filters(
+        Q(internship=internship), today, shared_holidays, internship.start_date
+    )
+    return DailyTimeRecord.objects.filter(branches), aggregates
+
+
+def split_dates(value):
+    return {date.fromisoformat(d) for d in (value or "").split(",") if d}
+
+
+def shared_holidays_for(internship):
+    return holiday_calendar.dates_for(internship.company_name, start=internship.start_date)
+
+
+def get_internship_stats(internship, today=None):
+    if today is None:
+        today = timezone.localdate()
+    shared = shared_holidays_for(internship)
+    queryset, aggregates = stats_totals_query(internship, today, shared)
+    totals = queryset.aggregate(**aggregates)
+    return build_internship_stats(internship, today, totals, shared)
+
+
+async def aget_internship_stats(internship, today=None):
+    if today is None:
+        today = timezone.localdate()
+    shared = await sync_to_async(shared_holidays_for)(internship)
+    queryset, aggregates = stats_totals_query(internship, today, shared)
+    totals = await queryset.aaggregate(**aggregates)
+    return build_internship_stats(internship, today, totals, shared)
+
+
+def build_internship_stats(internship, today, totals, shared_holidays=()):
+    _, last_day = monthrange(today.year, today.month)
+
+    # --- Overall ---
+    total_logged = internship.total_hours_logged
+    total_required = internship.total_hours_required
+    remaining_hours = max(total_required - total_logged, 0)
+    percent_complete = (total_logged / total_required) * 100 if total_required else 0
+
+    total_days_logged = internship.days_attended
+
+    holiday_dates = split_dates(totals["holiday_dates"]) | (
+        set(shared_holidays) - split_dates(totals.get("overridden_dates"))
+    )
+
+    calendar = WorkdayCalendar(holiday_dates)
+
+    standard_hours_per_week = 40
+    standard_hours_per_day = 10
+
+    if remaining_hours > 0:
+        days_left = int((remaining_hours / standard_hours_per_day) + 0.999)
+        projected_completion = calendar.add(today, days_left)
+    else:
+        days_left = 0
+        projected_completion = today
+
+    # --- Pace ---
+    total_avg = round(total_logged / max(total_days_logged, 1), 2)
+    weeks_left = math.ceil(days_left / 4) if days_left > 0 else 0
+
+    start_date = internship.start_date
+
+    # Count actual working days elapsed since start excluding holidays and today
+    workdays_elapsed = calendar.count(start_date, today)
+    weeks_elapsed = workdays_elapsed / 4
+    expected_hours_by_now = round(weeks_elapsed * standard_hours_per_week, 2)
+    hours_ahead_behind = round(total_logged - expected_hours_by_now, 2)
+
+    if hours_ahead_behind > 0:
+        pace_status = "Ahead"
+    elif hours_ahead_behind < 0:
+        pace_status = "Behind"
+    else:
+        pace_status = "On Track"
+
+    required_avg_going_forward = (
+        round(remaining_hours / weeks_left, 2) if weeks_left > 0 else 0
+    )
+
+    # --- Monthly ---
+    hours_this_month = totals["hours_this_month"] or 0
+    days_attended_this_month = totals["days_attended_this_month"]
+
+    monthly_avg = round(hours_this_month / max(days_attended_this_month, 1), 2)
+
+    # Workdays elapsed this month excluding holidays and today
+    workdays_elapsed_this_month = calendar.count(today.replace(day=1), today)
+
+    # Workdays remaining this month excluding holidays (starts from tomorrow)
+    workdays_remaining_in_month = calendar.count(
+        today + timedelta(days=1), today.replace(day=last_day) + timedelta(days=1)
+    )
+
+    # Monthly hours based on 40hr work week
+    total_workdays_this_month = (
+        workdays_elapsed_this_month + workdays_remaining_in_month
+    )
+    weeks_in_month = total_workdays_this_month / 4
+    hours_required_this_month = round(weeks_in_month * standard_hours_per_week, 2)
+    hours_remaining_this_month = round(
+        max(hours_required_this_month - hours_this_month, 0), 2
+    )
+    percent_complete_this_month = round(
+        (
+            (hours_this_month / hours_required_this_month) * 100
+            if hours_required_this_month
+            else 0
+        ),
+        1,
+    )
+    projected_hours_end_of_month = round(
+        hours_this_month + (monthly_avg * workdays_remaining_in_month), 2
+    )
+
+    return {
+        # Overall
+        "total_logged": total_logged,
+        "total_required": total_required,
+        "remaining_hours": remaining_hours,
+        "percent_complete": percent_complete,
+        "total_days_logged": total_days_logged,
+        "projected_completion": projected_completion,
+        # Pace
+        "total_avg": total_avg,
+        "days_left": days_left,
+        "weeks_left": weeks_left,
+        "expected_hours_by_now": expected_hours_by_now,
+        "hours_ahead_behind": hours_ahead_behind,
+        "pace_status": pace_status,
+        "required_avg_going_forward": required_avg_going_forward,
+        # Monthly
+        "hours_this_month": hours_this_month,
+        "hours_required_this_month": hours_required_this_month,
+        "hours_remaining_this_month": hours_remaining_this_month,
+        "percent_complete_this_month": percent_complete_this_month,
+        "days_attended_this_month": days_attended_this_month,
+        "workdays_remaining_in_month": workdays_remaining_in_month,
+        "projected_hours_end_of_month": projected_hours_end_of_month,
+    }
+
+
+# One intern of a cohort: the Internship attributes build_internship_stats()
+# reads, plus the name columns, without building model instances.
+CohortMember = namedtuple(
+    "CohortMember",
+    "pk username first_name last_name start_date total_hours_required "
+    "total_hours_logged days_attended",
+)
+
+COHORT_FIELDS = (
+    "pk",
+    "user__username",
+    "user__first_name",
+    "user__last_name",
+    "start_date",
+    "total_hours_required",
+    "hours_logged",
+    "days_attended",
+)
+
+NO_RECORDS = {"hours_this_month": None, "days_attended_this_month": 0, "holiday_dates": None}
+
+
+def cohort_internships(company_name):
+    return filter_company(Internship.objects.all(), company_name)
+
+
+def get_cohort_stats(company_name, today=None):
+    """
+    build_internship_stats() for every internship at `company_name` in two
+    queries however large the cohort is: the internships, then the dashboard
+    aggregates grouped by internship. Returns (CohortMember, stats) pairs
+    ordered by username.
+    """
+    if today is None:
+        today = timezone.localdate()
+    members = [
+        CohortMember._make(row)
+        for row in cohort_internships(company_name)
+        .order_by("user__username")
+        .values_list(*COHORT_FIELDS)
+    ]
+    if not members:
+        return []
+
+    start = min(member.start_date for member in members)
+    shared = holiday_calendar.dates_for(company_name, start=start)
+    # A subquery rather than a join lets each OR branch stay an index range.
+    branches, aggregates = stats_filters(
+        Q(internship__in=cohort_internships(company_name).values("pk")), today, shared, start
+    )
+    rows = (
+        DailyTimeRecord.objects.filter(branches)
+        .order_by()
+        .values("internship_id")
+        .annotate(**aggregates)
+    )
+    totals = {row.pop("internship_id"): row for row in rows}
+
+    return [
+        (
+            member,
+            build_internship_stats(
+                member,
+                today,
+                totals.get(member.pk, NO_RECORDS),
+                # Same slice shared_holidays_for() would read for this intern.
+                shared[bisect_left(shared, member.start_date):],
+            ),
+        )
+        for member in members
+    ]
+
+
+EMPTY_MONTH = (0.0, 0, 0, 0, 0)
+
+
+def month_range(first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        yield month
+        month = next_month(month)
+
+
+def month_totals(internship_ids, first_month, last_month, today=None):
+    """
+    Returns {(internship_id, month): rollup tuple} for the months from
+    first_month to last_month (first days) that have records. Months before
+    the current one are read from MonthlyRollup; only the current month and
+    any later ones are aggregated from the records.
+    """
+    current = month_start(today or timezone.localdate())
+    totals = {}
+    if first_month < current:
+        stored = MonthlyRollup.objects.filter(
+            internship_id__in=internship_ids,
+            month__gte=first_month,
+            month__lte=last_month,
+            month__lt=current,
+        ).values_list("internship_id", "month", *ROLLUP_FIELDS)
+        for internship_id, month, *values in stored:
+            totals[internship_id, month] = tuple(values)
+
+    live = list(month_range(max(first_month, current), last_month))
+    if live:
+        totals.update(compute_monthly_rollups(internship_ids, live))
+    return totals
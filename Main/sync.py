@@ -0,0 +1,75 @@
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+
+from .models import DailyTimeRecord, RecordTombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def format_cursor(moment):
+    # Whole microseconds since the epoch: URL-safe and exact.
+    return str((moment - EPOCH) // MICROSECOND)
+
+
+def parse_cursor(value):
+    """
+    The moment a `since` cursor stands for, or None when there is none.
+    Raises ValueError for anything that isn't a cursor.
+    """
+    if not value:
+        return None
+    micros = int(value)
+    if micros < 0:
+        raise ValueError("Negative cursor")
+    try:
+        return EPOCH + micros * MICROSECOND
+    except OverflowError:
+        raise ValueError("Cursor past the last representable moment")
+
+
+def sync_cursor(internship, now):
+    """
+    The cursor to hand back: everything written at or before it has been
+    sent. Writes bump Internship.updated_at after stamping their records,
+    so an idle internship's cursor is its updated_at and stays put between
+    polls. Recent writes hold it SYNC_CURSOR_LAG_SECONDS behind the clock,
+    so a transaction that stamped its rows before this poll but commits
+    after it is still picked up next time.
+    """
+    settled = now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+    return min(internship.updated_at, settled)
+
+
+def needs_full_sync(since, now):
+    # Deletions older than the tombstone window are forgotten.
+    return since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+
+
+def changes_since(internship, since, now):
+    """
+    Returns (full, records, deleted days) for a client that has everything
+    up to `since`. A full sync lists every record and no deletions; the
+    client replaces what it holds.
+    """
+    records = DailyTimeRecord.objects.filter(internship=internship).order_by("date")
+    if needs_full_sync(since, now):
+        return True, list(records), []
+    if internship.updated_at <= since:
+        # Nothing written since the cursor: no need to ask the database.
+        return False, [], []
+
+    records = list(records.filter(updated_at__gt=since))
+    # A day deleted and logged again since the cursor comes back as a record.
+    rewritten = {record.date for record in records}
+    deleted = [
+        day
+        for day in RecordTombstone.objects.filter(
+            internship=internship, deleted_at__gt=since
+        )
+        .order_by("date")
+        .values_list("date", flat=True)
+        if day not in rewritten
+    ]
+    return False, records, deleted
@@ -1,3 +1,1235 @@
-from django.test import TestCase
+import json
+import random
+import re
+import tempfile
+import threading
+import traceback
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin import DailyTimeRecordInline
+from .backends import InternshipBackend, aget_user_internship, get_user_internship
+from .cache import calendar_fragment_counter, get_cached_stats, stats_cache_counter
+from .dtr_import import import_records
+from .dtr_writes import RecordChanged
+from .holidays import HolidayFileError, holiday_calendar, load_holidays
+from .management.commands.bench_workdays import loop_add, loop_count
+from .metrics import registry as metrics_registry
+from .models import (
+    ROLLUP_FIELDS,
+    DailyTimeRecord,
+    Holiday,
+    Internship,
+    MonthlyRollup,
+    Punch,
+    RecordTombstone,
+    compute_monthly_rollups,
+    compute_rollups,
+)
+from .punches import ALREADY_LOGGED, LOST_RACE, PUNCH_ACTIONS, apply_punches, log_punch
+from .stats import (
+    cohort_internships,
+    get_cohort_stats,
+    get_internship_stats,
+    stats_totals_query,
+)
+from .sync import changes_since, format_cursor
+from .workdays import WorkdayCalendar
+
+
+def make_internship(username="intern", **kwargs):
+    user = User.objects.create(username=username)
+    return Internship.objects.create(
+        user=user,
+        company_name=kwargs.pop("company_name", "Acme"),
+        start_date=kwargs.pop("start_date", date(2026, 1, 5)),
+        total_hours_required=kwargs.pop("total_hours_required", 486),
+        **kwargs,
+    )
+
+
+def log_day(internship, day, **values):
+    values.setdefault("am_in", time(8))
+    values.setdefault("am_out", time(12))
+    return DailyTimeRecord.objects.create(internship=internship, date=day, **values)
+
+
+def run_concurrently(target, calls):
+    """
+    Runs target(*args) for every args in `calls`, each in its own thread
+    with its own database connection, all released at once. Returns the
+    results in order and the tracebacks of any "database is locked" or
+    RecordChanged errors; anything else fails the thread and leaves its
+    result None.
+    """
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+    errors = []
+
+    def run(index, args):
+        try:
+            barrier.wait()
+            results[index] = target(*args)
+        except (OperationalError, RecordChanged):
+            errors.append(traceback.format_exc())
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=item) for item in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class RollupTestMixin:
+    def assertRollupsInStep(self, internship):
+        internship.refresh_from_db()
+        stored = tuple(getattr(internship, name) for name in ROLLUP_FIELDS)
+        expected = compute_rollups([internship.pk]).get(internship.pk, (0.0, 0, 0, 0, 0))
+        self.assertEqual(stored, expected)
+        monthly = {
+            (row.internship_id, row.month): tuple(getattr(row, name) for name in ROLLUP_FIELDS)
+            for row in MonthlyRollup.objects.filter(internship=internship)
+        }
+        self.assertEqual(monthly, compute_monthly_rollups([internship.pk]))
+
+
+class DeferredRecordTests(RollupTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        log_day(self.internship, date(2026, 3, 2))
+        log_day(self.internship, date(2026, 3, 3), pm_in=time(13), pm_out=time(17))
+
+    def test_deferred_load(self):
+        records = list(DailyTimeRecord.objects.only("pk", "internship"))
+        self.assertEqual(len(records), 2)
+
+    def test_save_deferred_record_moves_rollups(self):
+        record = DailyTimeRecord.objects.only("pk", "internship").get(date=date(2026, 3, 3))
+        record.pm_in = record.pm_out = None
+        record.save()
+        self.assertRollupsInStep(self.internship)
+        self.assertEqual(self.internship.hours_logged, 8)
+
+    def test_move_deferred_record_to_another_month(self):
+        record = DailyTimeRecord.objects.only("pk", "date").get(date=date(2026, 3, 2))
+        record.date = date(2026, 4, 1)
+        record.save()
+        self.assertRollupsInStep(self.internship)
+
+    def test_delete_deferred_record(self):
+        DailyTimeRecord.objects.only("pk").get(date=date(2026, 3, 3)).delete()
+        self.assertRollupsInStep(self.internship)
+        self.assertEqual(self.internship.hours_logged, 4)
+
+
+class InternshipBackendTests(TestCase):
+    def setUp(self):
+        self.backend = InternshipBackend()
+        self.internship = make_internship()
+
+    def test_loads_the_internship_with_the_user(self):
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.internship.user.pk)
+            self.assertEqual(get_user_internship(user), self.internship)
+        with self.assertNumQueries(1):
+            user = async_to_sync(self.backend.aget_user)(self.internship.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(aget_user_internship)(user), self.internship)
+
+    def test_account_without_internship(self):
+        staff = User.objects.create_user("staff", is_staff=True)
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_user_internship(self.backend.get_user(staff.pk)))
+
+    def test_inactive_or_missing_user(self):
+        User.objects.filter(pk=self.internship.user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.internship.user.pk))
+        self.assertIsNone(self.backend.get_user(0))
+
+
+class DashboardQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        holiday_calendar.invalidate()
+        # Load the shared holiday calendar up front; it is rechecked at most
+        # every HOLIDAY_CALENDAR_CHECK_SECONDS.
+        self.assertIsNotNone(holiday_calendar.version)
+        self.internship = make_internship()
+        self.today = timezone.localdate()
+        for day in range(1, self.today.day):
+            log_day(self.internship, self.today.replace(day=day))
+        self.client.force_login(self.internship.user)
+
+    def test_cold_load(self):
+        # Session, user with internship, the month's data version, stats
+        # aggregate and the month's records, which include today's.
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_load(self):
+        self.client.get(reverse("index"))
+        # Session, user with internship, the month's data version and
+        # today's record.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_load_after_write(self):
+        self.client.get(reverse("index"))
+        with self.captureOnCommitCallbacks(execute=True):
+            log_day(self.internship, self.today)
+        # The stats and the month are computed again; nothing else is.
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.context["next_action"], "pm_in")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        self.day = date(2026, 3, 2)
+        log_day(self.internship, self.day)
+        self.client.force_login(self.internship.user)
+
+    def assertRevalidates(self, url, params, write):
+        # The first response sets the CSRF cookie the dashboard ETag covers.
+        self.client.get(url, params)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(url, params, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        write()
+        response = self.client.get(url, params, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_dashboard(self):
+        self.assertRevalidates(
+            reverse("index"),
+            {"month": 3, "year": 2026},
+            lambda: log_day(self.internship, date(2026, 3, 3)),
+        )
+
+    def test_daily_record(self):
+        def write():
+            record = DailyTimeRecord.objects.get(date=self.day)
+            record.pm_in, record.pm_out = time(13), time(17)
+            record.save()
+
+        self.assertRevalidates(
+            reverse("get-daily-record"),
+            {"day": self.day.day, "month": self.day.month, "year": self.day.year},
+            write,
+        )
+
+
+class WriteQueryTests(TestCase):
+    # Every write reads the day, then writes it in one transaction: the
+    # conditional statement (see write_day) and the internship's and month's
+    # rollups. The read can't be folded into the write: its values are what
+    # the statement is conditioned on and what the rollups move by.
+    # With the session and the user with internship that makes 8 queries.
+    def setUp(self):
+        holiday_calendar.invalidate()
+        self.assertIsNotNone(holiday_calendar.version)
+        self.internship = make_internship()
+        # A month of its own, whatever today is.
+        self.day = date(2025, 3, 3)
+        log_day(self.internship, self.day)
+        self.client.force_login(self.internship.user)
+
+    def post(self, name, **data):
+        data.update(day=self.day.day, month=self.day.month, year=self.day.year)
+        return self.client.post(reverse(name), data)
+
+    def test_quick_log(self):
+        # Today's month has no rollup row yet: computing and inserting it
+        # takes two more.
+        with self.assertNumQueries(10):
+            self.client.post(reverse("quick-log"), {"log_action": "am_in"})
+        with self.assertNumQueries(8):
+            self.client.post(reverse("quick-log"), {"log_action": "am_out"})
+        record = DailyTimeRecord.objects.get(internship=self.internship, date=timezone.localdate())
+        self.assertIsNotNone(record.am_out)
+
+    def test_mark_day(self):
+        with self.assertNumQueries(8):
+            self.post("mark-day", mark="absent")
+        self.assertTrue(DailyTimeRecord.objects.get(date=self.day).is_absent)
+
+    def test_update_daily_record(self):
+        with self.assertNumQueries(8):
+            self.post("update-log", am_in="08:00", am_out="12:00", pm_in="13:00", pm_out="17:00")
+        self.day = date(2025, 3, 4)
+        with self.assertNumQueries(8):
+            self.post("update-log", am_in="08:00", am_out="12:00")
+        self.assertEqual(DailyTimeRecord.objects.filter(internship=self.internship).count(), 2)
+
+    def test_delete_daily_record(self):
+        # Two more than an update: the tombstone that delta sync reports the
+        # deletion from, and pruning this internship's expired tombstones.
+        with self.assertNumQueries(10):
+            self.post("delete-log")
+        self.assertFalse(DailyTimeRecord.objects.exists())
+
+
+class BatchUpdateTests(RollupTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        log_day(self.internship, date(2026, 3, 2))
+        log_day(self.internship, date(2026, 3, 3))
+        log_day(self.internship, date(2026, 3, 4), am_in=None, am_out=None, is_holiday=True)
+        Holiday.objects.create(date=date(2026, 3, 6), name="Founding Day")
+        holiday_calendar.invalidate()
+        self.client.force_login(self.internship.user)
+
+    def batch(self, *operations):
+        response = self.client.post(
+            reverse("batch-log"),
+            json.dumps({"operations": operations}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def stored(self, day):
+        return DailyTimeRecord.objects.filter(internship=self.internship, date=day).first()
+
+    def test_mixed_operations(self):
+        results = self.batch(
+            {"date": "2026-03-02", "action": "clear"},
+            {"date": "2026-03-03", "action": "set", "am_in": "08:00", "am_out": "12:00",
+             "pm_in": "13:00", "pm_out": "17:00"},
+            {"date": "2026-03-05", "action": "absent"},
+            {"date": "2026-03-09", "action": "set", "am_in": "09:00", "am_out": "11:30"},
+        )
+        self.assertEqual([result["ok"] for result in results], [True] * 4)
+        self.assertEqual([result["total_hours"] for result in results], [0, 8, 0, 2.5])
+        self.assertIsNone(self.stored(date(2026, 3, 2)))
+        self.assertTrue(self.stored(date(2026, 3, 5)).is_absent)
+        self.assertRollupsInStep(self.internship)
+
+    def test_set_keeps_marked_day(self):
+        results = self.batch(
+            {"date": "2026-03-04", "action": "set", "am_in": "08:00", "am_out": "12:00"},
+        )
+        self.assertEqual(
+            results[0]["errors"], {"__all__": ["Cannot log time on a holiday, weekend, or absent day."]}
+        )
+        record = self.stored(date(2026, 3, 4))
+        self.assertTrue(record.is_holiday)
+        self.assertIsNone(record.am_in)
+
+        # Clearing the mark first makes it a working day again.
+        results = self.batch(
+            {"date": "2026-03-04", "action": "clear"},
+            {"date": "2026-03-04", "action": "set", "am_in": "08:00", "am_out": "12:00"},
+        )
+        self.assertEqual([result["ok"] for result in results], [True, True])
+        self.assertFalse(self.stored(date(2026, 3, 4)).is_holiday)
+        self.assertRollupsInStep(self.internship)
+
+    def test_set_on_shared_holiday(self):
+        results = self.batch(
+            {"date": "2026-03-06", "action": "set", "am_in": "08:00", "am_out": "12:00"},
+            {"date": "2026-03-06", "action": "absent"},
+        )
+        self.assertEqual([result["ok"] for result in results], [False, True])
+        self.assertTrue(self.stored(date(2026, 3, 6)).is_absent)
+
+    def test_invalid_operations_are_skipped(self):
+        results = self.batch(
+            {"date": "2026-03-03", "action": "set", "am_in": "12:00", "am_out": "08:00"},
+            {"date": "2026-03-10", "action": "set", "am_in": "8 o'clock"},
+            {"date": "2026-02-30", "action": "clear"},
+            {"date": "2026-03-11", "action": "lunch"},
+            {"date": "2026-03-12", "action": "set", "am_in": "08:00", "am_out": "12:00"},
+        )
+        self.assertEqual([result["ok"] for result in results], [False] * 4 + [True])
+        self.assertEqual(list(results[0]["errors"]), ["am_out"])
+        self.assertEqual(results[1]["errors"], {"__all__": ["Times must look like HH:MM."]})
+        self.assertEqual(list(results[2]["errors"]), ["date"])
+        self.assertEqual(list(results[3]["errors"]), ["action"])
+        self.assertEqual(self.stored(date(2026, 3, 3)).am_in, time(8))
+        self.assertRollupsInStep(self.internship)
+
+
+class ImportTests(RollupTestMixin, TestCase):
+    HEADER = "username,date,am_in,am_out,pm_in,pm_out,is_holiday,is_weekend,is_absent\n"
+
+    def setUp(self):
+        self.internship = make_internship()
+        self.client.force_login(self.internship.user)
+
+    def upload(self, rows):
+        response = self.client.post(
+            reverse("import-log"),
+            {"file": SimpleUploadedFile("records.csv", (self.HEADER + rows).encode())},
+        )
+        return response.status_code, response.json()
+
+    def test_good_and_bad_rows(self):
+        status, payload = self.upload(
+            ",2026-03-02,08:00,12:00,13:00,17:00,,,\n"
+            ",2026-03-03,08:00,12:00,,,,,\n"
+            ",2026-03-04,,,,,yes,,\n"
+            ",2026-03-05,8am,,,,,,\n"
+            ",2026-03-06,12:00,08:00,,,,,\n"
+            ",2026-03-09,08:00,12:00,,,,,x\n"
+            ",2026-02-30,,,,,,,\n"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["imported"], 3)
+        self.assertEqual([error["line"] for error in payload["errors"]], [5, 6, 7, 8])
+        stored = DailyTimeRecord.objects.filter(internship=self.internship)
+        self.assertEqual(
+            {record.date.day: record.total_hours for record in stored}, {2: 8, 3: 4, 4: 0}
+        )
+        self.assertRollupsInStep(self.internship)
+        self.assertEqual(self.internship.holiday_count, 1)
+
+    def test_reimport_updates_records(self):
+        log_day(self.internship, date(2026, 3, 2), pm_in=time(13), pm_out=time(17))
+        self.upload(",2026-03-02,08:00,12:00,,,,,\n,2026-03-03,,,,,,,yes\n")
+        _, payload = self.upload(",2026-03-02,,,,,,yes,\n,2026-03-03,09:00,12:00,,,,,\n")
+        self.assertEqual(payload["imported"], 2)
+        stored = {record.date.day: record for record in DailyTimeRecord.objects.all()}
+        self.assertEqual(len(stored), 2)
+        self.assertTrue(stored[2].is_weekend)
+        self.assertEqual(stored[3].total_hours, 3)
+        self.assertRollupsInStep(self.internship)
+
+    def test_batches_keep_rollups_in_step(self):
+        rows = [f",2026-03-{day:02d},08:00,12:00,,,,,\n" for day in range(2, 12)]
+        # The same day again in a later batch: the last row wins.
+        rows.append(",2026-03-02,08:00,10:00,,,,,\n")
+        imported, errors = import_records(
+            [self.HEADER, *rows], internship=self.internship, batch_size=3
+        )
+        self.assertEqual((imported, errors), (11, []))
+        self.assertEqual(DailyTimeRecord.objects.get(date=date(2026, 3, 2)).total_hours, 2)
+        self.assertRollupsInStep(self.internship)
+
+    def test_staff_import_by_username(self):
+        other = make_internship("other")
+        staff = User.objects.create(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        _, payload = self.upload(
+            "intern,2026-03-02,08:00,12:00,,,,,\n"
+            "other,2026-03-02,08:00,12:00,13:00,17:00,,,\n"
+            "nobody,2026-03-02,08:00,12:00,,,,,\n"
+        )
+        self.assertEqual(payload["imported"], 2)
+        self.assertEqual(payload["errors"], [{"line": 4, "error": "no internship for user 'nobody'"}])
+        self.assertRollupsInStep(self.internship)
+        self.assertRollupsInStep(other)
+        self.assertEqual((self.internship.hours_logged, other.hours_logged), (4, 8))
+
+    def test_intern_import_ignores_username(self):
+        other = make_internship("other")
+        self.upload("other,2026-03-02,08:00,12:00,,,,,\n")
+        self.assertEqual(DailyTimeRecord.objects.get().internship, self.internship)
+        self.assertFalse(other.dailytimerecord_set.exists())
+
+    def test_malformed_file(self):
+        status, payload = self.upload(f",2026-03-02,{'8' * 200000},,,,,,\n")
+        self.assertEqual(status, 400)
+        self.assertIn("field larger than field limit", payload["error"])
+        self.assertFalse(DailyTimeRecord.objects.exists())
+
+
+class RecomputeHoursTests(RollupTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        for day in range(2, 7):
+            log_day(self.internship, date(2026, 3, day))
+        # A fix made directly in SQL: the stored hours no longer match.
+        DailyTimeRecord.objects.filter(date__day__in=[3, 5]).update(am_out=time(11))
+
+    def recompute(self, *args):
+        out = StringIO()
+        call_command("recompute_hours", "--chunk-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_without_writing(self):
+        output = self.recompute("--dry-run")
+        self.assertEqual(len(re.findall(r": 4\.0 -> 3\.0", output)), 2)
+        self.assertIn("Would update 2 of 5 time records.", output)
+        self.assertFalse(DailyTimeRecord.objects.exclude(total_hours=4).exists())
+
+    def test_repairs_hours_and_rollups(self):
+        self.assertIn("Updated 2 of 5 time records.", self.recompute())
+        self.assertEqual(DailyTimeRecord.objects.filter(total_hours=3).count(), 2)
+        self.assertRollupsInStep(self.internship)
+        self.assertEqual(self.internship.hours_logged, 18)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        log_day(self.internship, date(2026, 3, 2), pm_in=time(13), pm_out=time(17))
+        log_day(self.internship, date(2026, 3, 3))
+        log_day(make_internship("other"), date(2026, 3, 2))
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("export_dtr", *args, stdout=out)
+        return out.getvalue()
+
+    def test_command_writes_to_stdout_or_file(self):
+        exported = self.export("--username", "intern")
+        self.assertEqual(
+            exported.splitlines(),
+            [
+                "username,date,am_in,am_out,pm_in,pm_out,total_hours,is_holiday,is_weekend,is_absent",
+                "intern,2026-03-02,08:00,12:00,13:00,17:00,8,0,0,0",
+                "intern,2026-03-03,08:00,12:00,,,4,0,0,0",
+            ],
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/export.csv"
+            self.assertEqual(self.export("--username", "intern", "-o", path), "")
+            with open(path, newline="") as f:
+                self.assertEqual(f.read(), exported)
+
+    def test_company_ignores_case_and_spaces(self):
+        make_internship("spaced", company_name=" ACME ")
+        make_internship("elsewhere", company_name="Initech")
+        exported = self.export("--company", "acme")
+        self.assertEqual(
+            [line.split(",")[0] for line in exported.splitlines()[1:]],
+            ["intern", "intern", "other"],
+        )
+        self.assertQuerySetEqual(
+            cohort_internships("Acme ").order_by("user__username"),
+            ["intern", "other", "spaced"],
+            transform=lambda internship: internship.user.username,
+        )
+
+
+class SummaryTests(TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        log_day(self.internship, date(2025, 2, 3))
+        log_day(self.internship, date(2025, 2, 4), pm_in=time(13), pm_out=time(17))
+        log_day(self.internship, date(2025, 2, 5), am_in=None, am_out=None, is_holiday=True)
+        log_day(self.internship, date(2025, 7, 1), am_in=None, am_out=None, is_absent=True)
+        log_day(make_internship("other"), date(2025, 2, 3))
+
+    def year_summary(self, year):
+        self.client.force_login(self.internship.user)
+        return self.client.get(reverse("year-summary"), {"year": year}).json()
+
+    def test_year_summary(self):
+        summary = self.year_summary(2025)
+        self.assertEqual(summary["year"], 2025)
+        self.assertEqual(summary["hours"], [0, 12, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(summary["days_attended"][:3], [0, 2, 0])
+        self.assertEqual(summary["holidays"][:3], [0, 1, 0])
+        self.assertEqual(summary["weekends"], [0] * 12)
+        self.assertEqual(summary["absences"][6], 1)
+        self.assertEqual(sum(summary["absences"]), 1)
+
+    def test_year_summary_includes_this_month(self):
+        today = timezone.localdate()
+        log_day(self.internship, today)
+        summary = self.year_summary(today.year)
+        self.assertEqual(summary["hours"][today.month - 1], 4)
+        self.assertEqual(summary["days_attended"][today.month - 1], 1)
+
+    def test_export_summary(self):
+        out = StringIO()
+        # Without a range it spans the months with records.
+        call_command("export_dtr", "--summary", stdout=out)
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                "username,month,hours,days_attended,holidays,weekends,absences",
+                "intern,2025-02,12,2,1,0,0",
+                "intern,2025-07,0,0,0,0,1",
+                "other,2025-02,4,1,0,0,0",
+            ],
+        )
+
+
+class SharedHolidayTests(TestCase):
+    def setUp(self):
+        holiday_calendar.invalidate()
+
+    def load(self, text, **kwargs):
+        return load_holidays(StringIO(text), **kwargs)
+
+    def holidays(self):
+        return sorted(
+            Holiday.objects.values_list("date", "company_name", "name")
+        )
+
+    def test_load_upserts_by_date_and_company(self):
+        Holiday.objects.create(date=date(2026, 12, 25), name="Xmas")
+        loaded = self.load(
+            "date,name,company\n"
+            "2026-12-25,Christmas Day,\n"
+            "2026-12-26,Founders Day,Acme\n"
+        )
+        self.assertEqual(loaded, (2, 0))
+        self.assertEqual(
+            self.holidays(),
+            [
+                (date(2026, 12, 25), "", "Christmas Day"),
+                (date(2026, 12, 26), "Acme", "Founders Day"),
+            ],
+        )
+        self.assertTrue(holiday_calendar.is_holiday(" acme", date(2026, 12, 26)))
+        self.assertFalse(holiday_calendar.is_holiday("Initech", date(2026, 12, 26)))
+
+    def test_load_rejects_bad_rows(self):
+        for text in (
+            "day,name\n2026-12-25,Christmas Day\n",
+            "date,name\n12/25/2026,Christmas Day\n",
+            "date,name\n2026-12-25,\n",
+        ):
+            with self.subTest(text=text), self.assertRaises(HolidayFileError):
+                self.load(text)
+        self.assertFalse(Holiday.objects.exists())
+
+    def test_replace_deletes_only_within_scope(self):
+        Holiday.objects.create(date=date(2026, 1, 1), name="New Year")
+        Holiday.objects.create(date=date(2026, 6, 1), name="Anniversary", company_name="acme")
+        Holiday.objects.create(date=date(2026, 7, 1), name="Retreat", company_name="Acme")
+        Holiday.objects.create(date=date(2026, 8, 1), name="Picnic", company_name="Initech")
+        loaded = self.load(
+            "date,name\n2026-07-01,Summer Retreat\n", company_name="ACME", replace=True
+        )
+        self.assertEqual(loaded, (1, 2))
+        self.assertEqual(
+            self.holidays(),
+            [
+                (date(2026, 1, 1), "", "New Year"),
+                (date(2026, 7, 1), "ACME", "Summer Retreat"),
+                (date(2026, 8, 1), "Initech", "Picnic"),
+            ],
+        )
+
+    def test_shared_holiday_blocks_quick_log(self):
+        internship = make_internship(company_name="Acme ")
+        Holiday.objects.create(
+            date=timezone.localdate(), name="Founders Day", company_name="acme"
+        )
+        holiday_calendar.invalidate()
+        self.client.force_login(internship.user)
+        response = self.client.post(reverse("quick-log"), {"log_action": "am_in"})
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ["Cannot log time on a holiday, weekend, or absent day."],
+        )
+        self.assertFalse(DailyTimeRecord.objects.exists())
+
+
+class AdminTests(RollupTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "x")
+        )
+
+    def test_bulk_delete_keeps_rollups_and_tombstones(self):
+        kept = log_day(self.internship, date(2026, 3, 2))
+        doomed = [log_day(self.internship, date(2026, 3, day)) for day in (3, 4)]
+        response = self.client.post(
+            reverse("admin:Main_dailytimerecord_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [record.pk for record in doomed],
+                "post": "yes",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertQuerySetEqual(DailyTimeRecord.objects.all(), [kept])
+        self.assertRollupsInStep(self.internship)
+        self.assertEqual(self.internship.hours_logged, 4)
+        self.assertQuerySetEqual(
+            RecordTombstone.objects.order_by("date").values_list("date", flat=True),
+            [date(2026, 3, 3), date(2026, 3, 4)],
+        )
+
+    def test_inline_shows_the_most_recent_records(self):
+        days = [date(2026, 1, 5) + timedelta(days=n) for n in range(40)]
+        for day in days:
+            log_day(self.internship, day)
+        response = self.client.get(
+            reverse("admin:Main_internship_change", args=[self.internship.pk])
+        )
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(
+            sorted(form.instance.date for form in formset.forms),
+            days[-DailyTimeRecordInline.max_records :],
+        )
+
+
+class CalendarFragmentTests(TestCase):
+    MARCH, APRIL = {"month": 3, "year": 2026}, {"month": 4, "year": 2026}
+
+    def setUp(self):
+        cache.clear()
+        self.internship = make_internship()
+        self.march = log_day(self.internship, date(2026, 3, 2))
+        log_day(self.internship, date(2026, 4, 6))
+        self.client.force_login(self.internship.user)
+        for month in (self.MARCH, self.APRIL):
+            self.client.get(reverse("index"), month)
+
+    def renders(self, month):
+        """
+        Whether loading the dashboard for `month` rendered its calendar
+        rather than reading it from the cache.
+        """
+        before = calendar_fragment_counter.snapshot()
+        self.client.get(reverse("index"), month)
+        after = calendar_fragment_counter.snapshot()
+        self.assertEqual(after["hits"] + after["misses"] - before["hits"] - before["misses"], 1)
+        return after["misses"] > before["misses"]
+
+    def test_cached_until_written(self):
+        self.assertFalse(self.renders(self.MARCH))
+        self.assertFalse(self.renders(self.APRIL))
+
+    def test_edit_renders_only_its_month(self):
+        # No on-commit callbacks run here, as in a process that made no write.
+        self.march.pm_in, self.march.pm_out = time(13), time(17)
+        self.march.save()
+        self.assertTrue(self.renders(self.MARCH))
+        self.assertFalse(self.renders(self.MARCH))
+        self.assertFalse(self.renders(self.APRIL))
+
+    def test_edit_keeping_totals_renders_its_month(self):
+        self.march.am_in, self.march.am_out = time(9), time(13)
+        self.march.save()
+        self.assertTrue(self.renders(self.MARCH))
+        self.assertFalse(self.renders(self.APRIL))
+
+    def test_moved_record_renders_both_months(self):
+        self.march.date = date(2026, 4, 7)
+        self.march.save()
+        self.assertTrue(self.renders(self.MARCH))
+        self.assertTrue(self.renders(self.APRIL))
+
+    def test_deleted_record_renders_its_month(self):
+        self.march.delete()
+        self.assertTrue(self.renders(self.MARCH))
+        self.assertFalse(self.renders(self.APRIL))
+
+
+class StatsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.internship = make_internship()
+        log_day(self.internship, date(2026, 3, 2))
+
+    def cached_stats(self):
+        # A fresh load, as the next request would see the internship.
+        internship = Internship.objects.get(pk=self.internship.pk)
+        return get_cached_stats(internship, get_internship_stats)
+
+    def test_hit_until_written(self):
+        before = stats_cache_counter.snapshot()
+        self.assertEqual(self.cached_stats(), self.cached_stats())
+        after = stats_cache_counter.snapshot()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+    def test_write_from_another_process(self):
+        self.assertEqual(self.cached_stats()["total_logged"], 4)
+        # Nothing tells this process about the write (TestCase never runs
+        # on-commit callbacks); the moved updated_at is enough.
+        log_day(self.internship, date(2026, 3, 3))
+        self.assertEqual(self.cached_stats()["total_logged"], 8)
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+class CohortTests(TestCase):
+    TODAY = date(2026, 3, 6)
+
+    def setUp(self):
+        holiday_calendar.invalidate()
+        Holiday.objects.create(date=date(2026, 3, 4), name="Founders Day", company_name="Acme")
+        Holiday.objects.create(date=date(2026, 1, 6), name="Epiphany")
+        self.steady = make_internship("steady", start_date=date(2026, 3, 2))
+        self.behind = make_internship("behind")
+        make_internship("elsewhere", company_name="Initech")
+        # Ten hours on each of the week's three workdays so far: on track.
+        for day in (2, 3, 5):
+            log_day(
+                self.steady,
+                date(2026, 3, day),
+                am_in=time(7),
+                pm_in=time(13),
+                pm_out=time(18),
+            )
+        log_day(self.behind, date(2026, 3, 2))
+        log_day(self.behind, date(2026, 3, 3), am_in=None, am_out=None, is_absent=True)
+
+    def test_matches_each_interns_own_stats(self):
+        cohort = get_cohort_stats("Acme", self.TODAY)
+        self.assertEqual([member.username for member, _ in cohort], ["behind", "steady"])
+        for member, stats in cohort:
+            internship = Internship.objects.get(pk=member.pk)
+            self.assertEqual(stats, get_internship_stats(internship, self.TODAY))
+        self.assertEqual(cohort[0][1]["total_logged"], 4)
+        self.assertEqual(cohort[1][1]["total_logged"], 30)
+        self.assertEqual(cohort[1][1]["expected_hours_by_now"], 30)
+
+    def test_report_summary(self):
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        with mock.patch("django.utils.timezone.localdate", return_value=self.TODAY):
+            report = self.client.get(
+                reverse("cohort"), {"company": "Acme", "format": "json", "sort": "progress"}
+            ).json()
+        self.assertEqual(
+            [(row["username"], row["percent_complete"]) for row in report["interns"]],
+            [("steady", 6.2), ("behind", 0.8)],
+        )
+        self.assertEqual(
+            report["summary"],
+            {"interns": 2, "ahead": 0, "on_track": 1, "behind": 1, "percent_complete": 3.5},
+        )
+
+
+class StatsQueryPlanTests(TestCase):
+    # The (internship, date) unique index, whatever Django named it.
+    DATE_RANGE_SEEK = re.compile(r"USING INDEX \w+_uniq \(internship_id=\? AND date>\? AND date<\?\)")
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_benchmark", users=20, days=200, prefix="plan", stdout=StringIO())
+        cls.internship = Internship.objects.order_by("pk").first()
+        cls.today = timezone.localdate()
+
+    def plan(self, shared_holidays=()):
+        queryset, _ = stats_totals_query(self.internship, self.today, list(shared_holidays))
+        return queryset.order_by().explain()
+
+    def test_stats_query_seeks_holidays_and_month(self):
+        plan = self.plan()
+        self.assertIn("MULTI-INDEX OR", plan)
+        self.assertIn("USING INDEX dtr_holiday_idx (internship_id=? AND date>?)", plan)
+        self.assertRegex(plan, self.DATE_RANGE_SEEK)
+        self.assertNotIn("SCAN", plan)
+
+    def test_stats_query_with_shared_holidays(self):
+        plan = self.plan([self.today - timedelta(days=30), self.today - timedelta(days=60)])
+        self.assertIn("USING INDEX dtr_holiday_idx (internship_id=? AND date>?)", plan)
+        self.assertRegex(plan, self.DATE_RANGE_SEEK)
+        self.assertNotIn("SCAN", plan)
+
+    def test_sync_query_uses_sync_index(self):
+        since = timezone.now() - timedelta(days=1)
+        with CaptureQueriesContext(connection) as captured:
+            changes_since(self.internship, since, timezone.now())
+        sql = captured.captured_queries[0]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("USING INDEX dtr_sync_idx (internship_id=? AND updated_at>?)", plan)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_QUERY_BUDGET=3)
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics_registry.reset()
+        self.internship = make_internship()
+        self.staff = User.objects.create_user("staff", is_staff=True)
+
+    def test_middleware_records_requests_per_view(self):
+        self.client.force_login(self.internship.user)
+        self.client.get(reverse("index"))
+        self.client.get(reverse("month-records"), {"month": 3, "year": 2026})
+
+        snapshot = metrics_registry.snapshot()
+        self.assertEqual(set(snapshot["views"]), {"index", "month-records"})
+        index = snapshot["views"]["index"]
+        self.assertEqual(index["wall_ms"]["count"], 1)
+        self.assertGreater(index["queries"]["max"], 3)
+        self.assertEqual(index["over_budget"], 1)
+        self.assertEqual(
+            [(entry["view"], entry["path"]) for entry in snapshot["flagged"]],
+            [("index", reverse("index"))],
+        )
+
+    def test_report_is_staff_only(self):
+        self.client.force_login(self.internship.user)
+        response = self.client.get(reverse("metrics"), {"format": "json"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/login/", response["Location"])
+
+        self.client.force_login(self.staff)
+        report = self.client.get(reverse("metrics"), {"format": "json"}).json()
+        self.assertEqual(report["views"]["metrics"]["wall_ms"]["count"], 1)
+        self.assertEqual(
+            [counter["name"] for counter in report["caches"]],
+            ["internship-stats", "calendar-fragment", "stats-fragment"],
+        )
+
+    def test_reset(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse("index"))
+        self.client.post(reverse("metrics"), {"reset": "1"})
+        # Only the reset request itself, recorded once it returned.
+        self.assertEqual(list(metrics_registry.snapshot()["views"]), ["metrics"])
+
+
+@skipUnless(settings.DB_PROFILE == "production", "needs the production SQLite tuning")
+class QuickLogStressTests(RollupTestMixin, TransactionTestCase):
+    """
+    Many interns punching at once, one thread each, through the quick-log
+    view. Every write must queue behind the others rather than fail with
+    "database is locked", which takes the busy timeout that DB_PROFILE=basic
+    leaves at SQLite's stock five seconds.
+    """
+
+    INTERNS = 100
+
+    def setUp(self):
+        self.clients = []
+        for n in range(self.INTERNS):
+            internship = make_internship(f"stress-{n:03d}")
+            client = Client()
+            client.force_login(internship.user)
+            self.clients.append((internship, client))
+
+    def punch_day(self, client):
+        errors = []
+        for action in ("am_in", "am_out", "pm_in", "pm_out"):
+            response = client.post(reverse("quick-log"), {"log_action": action})
+            errors += [str(message) for message in get_messages(response.wsgi_request)]
+            if response.status_code != 302:
+                errors.append(f"{action}: {response.status_code}")
+        return errors
+
+    def test_concurrent_quick_logs(self):
+        results, errors = run_concurrently(
+            self.punch_day, [(client,) for _, client in self.clients]
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual([error for result in results for error in result], [])
+
+        today = timezone.localdate()
+        complete = DailyTimeRecord.objects.filter(date=today, pm_out__isnull=False)
+        self.assertEqual(complete.count(), self.INTERNS)
+        for internship, _ in self.clients[:: self.INTERNS // 10]:
+            self.assertRollupsInStep(internship)
+
+
+class QuickLogRaceTests(RollupTestMixin, TransactionTestCase):
+    """
+    One intern's punch submitted from many tabs at once, like a double
+    click: exactly one lands per step, and the rest are turned away with a
+    message instead of overwriting it or raising.
+    """
+
+    TABS = 100
+
+    def setUp(self):
+        self.internship = make_internship()
+        self.clients = []
+        for _ in range(self.TABS):
+            client = Client()
+            client.force_login(self.internship.user)
+            self.clients.append(client)
+
+    def punch(self, client, action):
+        # Drop what an earlier round left unread, so only this punch's
+        # messages come back.
+        client.cookies.pop("messages", None)
+        response = client.post(reverse("quick-log"), {"log_action": action})
+        self.assertEqual(response.status_code, 302)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_concurrent_submissions_of_each_step(self):
+        today = timezone.localdate()
+        for step, action in enumerate(PUNCH_ACTIONS):
+            with self.subTest(action=action):
+                results, errors = run_concurrently(
+                    self.punch, [(client, action) for client in self.clients]
+                )
+                self.assertEqual(errors, [])
+                self.assertEqual(results.count([]), 1)
+                rejections = {error for result in results for error in result}
+                self.assertLessEqual(rejections, {ALREADY_LOGGED, LOST_RACE})
+
+                record = DailyTimeRecord.objects.get(internship=self.internship, date=today)
+                logged = [name for name in PUNCH_ACTIONS if getattr(record, name) is not None]
+                self.assertEqual(logged, list(PUNCH_ACTIONS[: step + 1]))
+
+        self.assertEqual(DailyTimeRecord.objects.count(), 1)
+        self.assertRollupsInStep(self.internship)
+
+
+class SyncTestMixin:
+    def poll(self, since=None):
+        response = self.client.get(reverse("sync"), {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def sync(self, held, since=None):
+        """
+        Applies one poll to `held` ({date: hours}) the way a client does and
+        returns the next cursor.
+        """
+        payload = self.poll(since)
+        if payload["full"]:
+            held.clear()
+        for day in payload["deleted"]:
+            held.pop(day, None)
+        for record in payload["records"]:
+            held[record["date"]] = record["total_hours"]
+        return payload["cursor"]
+
+    def assertInSync(self, held):
+        stored = DailyTimeRecord.objects.filter(internship=self.internship)
+        self.assertEqual(held, {record.date.isoformat(): record.total_hours for record in stored})
+
+
+class SyncTests(SyncTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        self.first = log_day(self.internship, date(2026, 3, 2))
+        log_day(self.internship, date(2026, 3, 3))
+        self.client.force_login(self.internship.user)
+        self.held = {}
+        self.cursor = self.sync(self.held)
+
+    def test_first_poll_is_full(self):
+        self.assertInSync(self.held)
+        payload = self.poll(self.cursor)
+        self.assertFalse(payload["full"])
+
+    def test_delete_then_recreate(self):
+        self.first.delete()
+        log_day(self.internship, date(2026, 3, 2), pm_in=time(13), pm_out=time(17))
+        payload = self.poll(self.cursor)
+        self.assertEqual(payload["deleted"], [])
+        self.assertIn("2026-03-02", [record["date"] for record in payload["records"]])
+        self.sync(self.held, self.cursor)
+        self.assertInSync(self.held)
+        self.assertEqual(self.held["2026-03-02"], 8)
+
+    def test_delete(self):
+        self.first.delete()
+        payload = self.poll(self.cursor)
+        self.assertEqual(payload["deleted"], ["2026-03-02"])
+        self.sync(self.held, self.cursor)
+        self.assertInSync(self.held)
+
+    def test_record_moved_to_another_day(self):
+        self.first.date = date(2026, 3, 9)
+        self.first.save()
+        payload = self.poll(self.cursor)
+        self.assertEqual(payload["deleted"], ["2026-03-02"])
+        self.assertIn("2026-03-09", [record["date"] for record in payload["records"]])
+        self.sync(self.held, self.cursor)
+        self.assertInSync(self.held)
+
+    def test_cursor_older_than_tombstones(self):
+        since = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS, seconds=1)
+        self.first.delete()
+        payload = self.poll(format_cursor(since))
+        self.assertTrue(payload["full"])
+        self.assertEqual(payload["deleted"], [])
+        self.assertEqual([record["date"] for record in payload["records"]], ["2026-03-03"])
+
+    def test_invalid_cursors(self):
+        for since in ("99999999999999999999", "253402300800000000", "-1", "1.5", "soon"):
+            with self.subTest(since=since):
+                response = self.client.get(reverse("sync"), {"since": since})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+
+class SyncConcurrencyTests(SyncTestMixin, RollupTestMixin, TransactionTestCase):
+    def setUp(self):
+        self.internship = make_internship()
+        log_day(self.internship, date(2026, 3, 2))
+        self.client.force_login(self.internship.user)
+
+    def test_write_committed_after_poll(self):
+        held = {}
+        cursor = self.sync(held)
+        stamped, polled = threading.Event(), threading.Event()
+
+        def write():
+            # Stamps the record before the poll below, commits after it.
+            try:
+                with transaction.atomic():
+                    log_day(self.internship, date(2026, 3, 3))
+                    stamped.set()
+                    polled.wait(10)
+            finally:
+                connections.close_all()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        stamped.wait(10)
+        cursor = self.sync(held, cursor)
+        self.assertNotIn("2026-03-03", held)
+        polled.set()
+        writer.join()
+
+        self.sync(held, cursor)
+        self.assertInSync(held)
+
+
+# Recent enough to be within PUNCH_RETENTION_DAYS, and wholly in the past.
+PUNCH_DAY = timezone.localdate() - timedelta(days=1)
+PUNCH_TIMES = dict(zip(PUNCH_ACTIONS, (time(8), time(12), time(13), time(17))))
+
+
+def punch_moment(action):
+    return timezone.make_aware(datetime.combine(PUNCH_DAY, PUNCH_TIMES[action]))
+
+
+def punch_batch(name):
+    return [
+        {"id": f"{name}-{action}", "action": action, "at": punch_moment(action).isoformat()}
+        for action in PUNCH_ACTIONS
+    ]
+
+
+class PunchBatchTests(RollupTestMixin, TestCase):
+    def setUp(self):
+        self.internship = make_internship()
+
+    def test_replayed_batch_is_not_applied_again(self):
+        results, records = apply_punches(self.internship, punch_batch("a"))
+        self.assertTrue(all(result["ok"] for result in results))
+        self.assertEqual(records[PUNCH_DAY].total_hours, 8)
+        replayed, _ = apply_punches(self.internship, punch_batch("a"))
+        self.assertTrue(all(result["duplicate"] for result in replayed))
+        self.assertRollupsInStep(self.internship)
+
+    def test_day_written_meanwhile_is_kept(self):
+        is_holiday = holiday_calendar.is_holiday
+
+        def quick_log_from_another_tab(company_name, day):
+            # Runs after the batch has read the day, before it writes it.
+            log_day(self.internship, PUNCH_DAY, am_in=time(8, 5), am_out=None)
+            return is_holiday(company_name, day)
+
+        with mock.patch.object(holiday_calendar, "is_holiday", quick_log_from_another_tab):
+            results, records = apply_punches(self.internship, punch_batch("a")[:2])
+        self.assertEqual([result["error"] for result in results], [LOST_RACE, LOST_RACE])
+        self.assertEqual(records[PUNCH_DAY].am_in, time(8, 5))
+        self.assertIsNone(records[PUNCH_DAY].am_out)
+        self.assertRollupsInStep(self.internship)
+
+    @override_settings(PUNCH_RETENTION_DAYS=7)
+    def test_expired_punches_are_refused_and_pruned(self):
+        expired = timezone.now() - timedelta(days=8)
+        Punch.objects.create(
+            internship=self.internship, client_id="old", action="am_in", punched_at=expired
+        )
+        results, _ = apply_punches(
+            self.internship,
+            [{"id": "old", "action": "am_in", "at": expired.isoformat()}, *punch_batch("a")],
+        )
+        self.assertEqual(results[0], {"id": "old", "ok": False, "error": "Punch is too old to apply."})
+        self.assertTrue(all(result["ok"] for result in results[1:]))
+        self.assertQuerySetEqual(
+            Punch.objects.order_by("punched_at").values_list("client_id", flat=True),
+            [f"a-{action}" for action in PUNCH_ACTIONS],
+        )
+
+
+class PunchConcurrencyTests(RollupTestMixin, TransactionTestCase):
+    def setUp(self):
+        self.internship = make_internship()
+
+    def quick_log_day(self):
+        return [
+            log_punch(self.internship, action, punch_moment(action)) for action in PUNCH_ACTIONS
+        ]
+
+    def test_batches_racing_quick_logs(self):
+        # Every thread punches the whole day: queued batches from an offline
+        # phone racing quick logs from open tabs. Each step must be written
+        # exactly once, and nothing may fail with "database is locked".
+        calls = [(apply_punches, self.internship, punch_batch(n)) for n in range(20)]
+        calls += [(self.quick_log_day,)] * 20
+        outcomes, errors = run_concurrently(lambda run, *args: run(*args), calls)
+        self.assertEqual(errors, [])
+
+        logged = dict.fromkeys(PUNCH_ACTIONS, 0)
+        for results, _ in outcomes[:20]:
+            for result in results:
+                logged[result["action"]] += result["ok"]
+                self.assertIn(result.get("error"), (None, ALREADY_LOGGED, LOST_RACE))
+        for errors in outcomes[20:]:
+            for action, error in zip(PUNCH_ACTIONS, errors):
+                logged[action] += error is None
+                self.assertIn(error, (None, ALREADY_LOGGED, LOST_RACE))
+        self.assertEqual(logged, dict.fromkeys(PUNCH_ACTIONS, 1))
+
+        record = DailyTimeRecord.objects.get(internship=self.internship, date=PUNCH_DAY)
+        self.assertEqual(record.total_hours, 8)
+        self.assertEqual(Punch.objects.filter(internship=self.internship).count(), 80)
+        self.assertRollupsInStep(self.internship)
+
+
+class WorkdayCalendarTests(SimpleTestCase):
+    def random_calendars(self, rng):
+        origin = date(2026, 1, 1)
+        for workdays_per_week in range(1, 8):
+            for _ in range(5):
+                holidays = [
+                    origin + timedelta(days=rng.randrange(-30, 400))
+                    for _ in range(rng.randrange(40))
+                ]
+                yield origin, WorkdayCalendar(holidays, workdays_per_week)
+
+    def test_count_matches_day_loop(self):
+        rng = random.Random(3)
+        for origin, calendar in self.random_calendars(rng):
+            for _ in range(40):
+                start = origin + timedelta(days=rng.randrange(-40, 400))
+                end = start + timedelta(days=rng.randrange(-10, 120))
+                with self.subTest(calendar.workdays_per_week, start=start, end=end):
+                    self.assertEqual(
+                        calendar.count(start, end), loop_count(calendar, start, end)
+                    )
+
+    def test_add_matches_day_loop(self):
+        rng = random.Random(4)
+        for origin, calendar in self.random_calendars(rng):
+            for _ in range(40):
+                start = origin + timedelta(days=rng.randrange(-40, 400))
+                n = rng.randrange(-2, 80)
+                with self.subTest(calendar.workdays_per_week, start=start, n=n):
+                    self.assertEqual(calendar.add(start, n), loop_add(calendar, start, n))
+
+    def test_add_lands_on_working_day(self):
+        calendar = WorkdayCalendar([date(2026, 3, 5), date(2026, 3, 9)])
+        # Wednesday 4 March: Thursday is a holiday, Friday to Sunday are off
+        # and Monday is a holiday.
+        self.assertEqual(calendar.add(date(2026, 3, 4), 1), date(2026, 3, 10))
+        self.assertEqual(calendar.count(date(2026, 3, 4), date(2026, 3, 11)), 2)
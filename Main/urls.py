@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Async twins of the hot views, used when served over ASGI.
+if settings.ASYNC_VIEWS:
+    index, get_daily_record, quick_log = views.aindex, views.aget_daily_record, views.aquick_log
+else:
+    index, get_daily_record, quick_log = views.index, views.get_daily_record, views.quick_log
+
 urlpatterns = [
-    path("", views.index, name="index"),
+    path("", index, name="index"),
     
     path("auth/", views.auth, name="auth"),
     path("login/", views.login_view, name="login"),
@@ -11,9 +18,19 @@ urlpatterns = [
     path("logout/", views.logout_view, name="logout"),
 
 
-    path('get-daily-record/', views.get_daily_record, name='get-daily-record'),
-    path("quick-log/", views.quick_log, name="quick-log"),
+    path('get-daily-record/', get_daily_record, name='get-daily-record'),
+    path("month-records/", views.get_month_records, name="month-records"),
+    path("year-summary/", views.get_year_summary, name="year-summary"),
+    path("sync/", views.sync_records, name="sync"),
+    path("quick-log/", quick_log, name="quick-log"),
+    path("punch-log/", views.ingest_punches, name="punch-log"),
     path("update-log/", views.update_daily_record, name="update-log"),
     path("delete-log/", views.delete_daily_record, name="delete-log"),
     path("mark-day/", views.mark_day, name="mark-day"),
+    path("batch-log/", views.batch_update_daily_records, name="batch-log"),
+    path("import-log/", views.import_daily_records, name="import-log"),
+    path("export-log/", views.export_daily_records, name="export-log"),
+
+    path("metrics/", views.metrics_report, name="metrics"),
+    path("cohort/", views.cohort_report, name="cohort"),
 ]
@@ -1,281 +1,361 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse
+import csv
+import json
+from calendar import monthrange
+from collections import Counter
+from datetime import date, datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q, Sum
-from django.contrib import messages
-from datetime import datetime, date, timedelta
-from django.utils import timezone
-from calendar import monthrange
-from .models import Internship, DailyTimeRecord
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
-import math
+from django.core.paginator import Paginator
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .backends import ainternship_or_404, get_user_internship, internship_or_404
+from .cache import (
+    aget_cached_fragment,
+    aget_cached_stats,
+    cache_counters,
+    calendar_fragment_counter,
+    fragment_cache_key,
+    get_cached_fragment,
+    get_cached_stats,
+    stats_fragment_counter,
+)
+from .conditional import condition_on_internship
+from .dtr_batch import MARK_ACTIONS, apply_day_operations
+from .dtr_export import (
+    export_internships,
+    export_lines,
+    export_queryset,
+    month_bounds,
+    summary_lines,
+)
+from .dtr_import import import_records
+from .dtr_writes import RecordChanged, mark_values, read_day, record_values, write_day
+from .holidays import company_key, holiday_calendar
+from .metrics import registry as metrics_registry
+from .models import DailyTimeRecord, Internship, amonth_data_version, month_data_version
+from .punches import apply_punches, log_punch, next_quick_log_action
+from .stats import (
+    EMPTY_MONTH,
+    aget_internship_stats,
+    get_cohort_stats,
+    get_internship_stats,
+    month_totals,
+)
+from .sync import (
+    changes_since,
+    format_cursor,
+    needs_full_sync,
+    parse_cursor,
+    sync_cursor,
+)
+
+
+def build_month_rows(records_map, year, month, holiday_days=()):
+    """
+    Returns one month of daily records for template rendering; days in
+    holiday_days without a record of their own show as shared holidays
+    """
+    _, last_day = monthrange(year, month)
+    rows = []
+    for day in range(1, last_day + 1):
+        record = records_map.get(day)
+        rows.append(
+            {
+                "day": day,
+                "month_num": month,
+                "year": year,
+                "am_in": record.am_in if record else None,
+                "am_out": record.am_out if record else None,
+                "pm_in": record.pm_in if record else None,
+                "pm_out": record.pm_out if record else None,
+                "hours": record.total_hours if record else None,
+                "is_holiday": record.is_holiday if record else day in holiday_days,
+                "is_weekend": record.is_weekend if record else False,
+                "is_absent": record.is_absent if record else False,
+            }
+        )
+    return {
+        "month": date(year, month, 1).strftime("%B"),
+        "month_num": month,
+        "year": year,
+        "rows": rows,
+    }
 
 
-def get_internship_stats(internship):
-    today = date.today()
+def build_month_payload(records_map, year, month, holiday_days=()):
+    """
+    Returns one month of daily records as parallel columns for the calendar JS
+    """
+    _, last_day = monthrange(year, month)
+    columns = {
+        "am_in": [],
+        "am_out": [],
+        "pm_in": [],
+        "pm_out": [],
+        "hours": [],
+        "mark": [],
+    }
+    for day in range(1, last_day + 1):
+        record = records_map.get(day)
+        for field in ("am_in", "am_out", "pm_in", "pm_out"):
+            value = getattr(record, field) if record else None
+            columns[field].append(value.strftime("%H:%M") if value else "")
+        columns["hours"].append(record.total_hours if record else 0)
+        if record.is_holiday if record else day in holiday_days:
+            columns["mark"].append("holiday")
+        elif record and record.is_weekend:
+            columns["mark"].append("weekend")
+        elif record and record.is_absent:
+            columns["mark"].append("absent")
+        else:
+            columns["mark"].append("")
 
-    # --- Overall ---
-    total_logged = internship.total_hours_logged
-    total_required = internship.total_hours_required
-    remaining_hours = max(total_required - total_logged, 0)
-    percent_complete = (total_logged / total_required) * 100 if total_required else 0
+    return {
+        "month": month,
+        "year": year,
+        "label": date(year, month, 1).strftime("%B %Y"),
+        "days": last_day,
+        **columns,
+    }
 
-    total_days_logged = (
-        DailyTimeRecord.objects.filter(
-            internship=internship, is_holiday=False, is_weekend=False
-        )
-        .filter(
-            Q(am_in__isnull=False, am_out__isnull=False)
-            | Q(pm_in__isnull=False, pm_out__isnull=False)
-        )
-        .count()
-    )
 
-    # Fetch all holiday dates once — reused across calculations
-    holiday_dates = set(
-        DailyTimeRecord.objects.filter(
-            internship=internship,
-            is_holiday=True,
-        ).values_list("date", flat=True)
+def month_records_query(internship, year, month):
+    _, last_day = monthrange(year, month)
+    return DailyTimeRecord.objects.filter(
+        internship=internship,
+        date__gte=date(year, month, 1),
+        date__lte=date(year, month, last_day),
     )
 
-    def is_working_day(d):
-        return d.weekday() < 4 and d not in holiday_dates
 
-    def add_workdays(start_date, workdays):
-        current_date = start_date
-        days_added = 0
-        while days_added < workdays:
-            current_date += timedelta(days=1)
-            if is_working_day(current_date):
-                days_added += 1
-        return current_date
+def month_holiday_days(internship, year, month):
+    """
+    Days of the month that are shared holidays for the intern's company
+    """
+    _, last_day = monthrange(year, month)
+    return {
+        d.day
+        for d in holiday_calendar.dates_for(
+            internship.company_name, date(year, month, 1), date(year, month, last_day)
+        )
+    }
 
-    standard_hours_per_week = 40
-    standard_hours_per_day = 10
 
-    if remaining_hours > 0:
-        days_left = int((remaining_hours / standard_hours_per_day) + 0.999)
-        projected_completion = add_workdays(today, days_left)
-    else:
-        days_left = 0
-        projected_completion = today
+def get_daily_records(internship, year, month):
+    return {r.date.day: r for r in month_records_query(internship, year, month)}
 
-    # --- Pace ---
-    total_avg = round(total_logged / max(total_days_logged, 1), 2)
-    weeks_left = math.ceil(days_left / 4) if days_left > 0 else 0
 
-    start_date = internship.start_date
+async def aget_daily_records(internship, year, month):
+    return {r.date.day: r async for r in month_records_query(internship, year, month)}
 
-    # Count actual working days elapsed since start excluding holidays and today
-    workdays_elapsed = sum(
-        1
-        for i in range((today - start_date).days)  # stops before today
-        if is_working_day(start_date + timedelta(days=i))
-    )
-    weeks_elapsed = workdays_elapsed / 4
-    expected_hours_by_now = round(weeks_elapsed * standard_hours_per_week, 2)
-    hours_ahead_behind = round(total_logged - expected_hours_by_now, 2)
-
-    if hours_ahead_behind > 0:
-        pace_status = "Ahead"
-    elif hours_ahead_behind < 0:
-        pace_status = "Behind"
-    else:
-        pace_status = "On Track"
 
-    required_avg_going_forward = (
-        round(remaining_hours / weeks_left, 2) if weeks_left > 0 else 0
-    )
+def parse_month(params):
+    """
+    Returns (month, year) from request params, defaulting to the current month
+    """
+    today = timezone.localdate()
+    try:
+        month = int(params.get("month", today.month))
+        year = int(params.get("year", today.year))
+        date(year, month, 1)
+    except (TypeError, ValueError):
+        return today.month, today.year
+    return month, year
 
-    # --- Monthly ---
-    monthly_records = DailyTimeRecord.objects.filter(
-        internship=internship,
-        date__year=today.year,
-        date__month=today.month,
-        is_holiday=False,
-        is_weekend=False,
-    )
 
-    hours_this_month = monthly_records.aggregate(total=Sum("total_hours"))["total"] or 0
+def month_version(request):
+    month, year = parse_month(request.GET)
+    return f"{year}-{month}"
 
-    days_attended_this_month = monthly_records.filter(
-        Q(am_in__isnull=False, am_out__isnull=False)
-        | Q(pm_in__isnull=False, pm_out__isnull=False)
-    ).count()
 
-    monthly_avg = round(hours_this_month / max(days_attended_this_month, 1), 2)
+@login_required
+@condition_on_internship(month_version)
+def get_month_records(request):
+    internship = internship_or_404(request)
+    month, year = parse_month(request.GET)
+    records_map = get_daily_records(internship, year, month)
+    holiday_days = month_holiday_days(internship, year, month)
+    return JsonResponse(build_month_payload(records_map, year, month, holiday_days))
 
-    _, last_day = monthrange(today.year, today.month)
 
-    # Workdays elapsed this month excluding holidays and today
-    workdays_elapsed_this_month = sum(
-        1
-        for d in range(1, today.day)  # exclude today
-        if is_working_day(date(today.year, today.month, d))
-    )
+def parse_year(params):
+    today = timezone.localdate()
+    try:
+        year = int(params.get("year", today.year))
+        date(year, 1, 1)
+    except (TypeError, ValueError):
+        return today.year
+    return year
 
-    # Workdays remaining this month excluding holidays (starts from tomorrow)
-    workdays_remaining_in_month = sum(
-        1
-        for d in range(today.day + 1, last_day + 1)
-        if is_working_day(date(today.year, today.month, d))
-    )
 
-    # Monthly hours based on 40hr work week
-    total_workdays_this_month = (
-        workdays_elapsed_this_month + workdays_remaining_in_month
-    )
-    weeks_in_month = total_workdays_this_month / 4
-    hours_required_this_month = round(weeks_in_month * standard_hours_per_week, 2)
-    hours_remaining_this_month = round(
-        max(hours_required_this_month - hours_this_month, 0), 2
-    )
-    percent_complete_this_month = round(
-        (
-            (hours_this_month / hours_required_this_month) * 100
-            if hours_required_this_month
-            else 0
-        ),
-        1,
-    )
-    projected_hours_end_of_month = round(
-        hours_this_month + (monthly_avg * workdays_remaining_in_month), 2
-    )
+def year_version(request):
+    return str(parse_year(request.GET))
 
-    return {
-        # Overall
-        "total_logged": total_logged,
-        "total_required": total_required,
-        "remaining_hours": remaining_hours,
-        "percent_complete": percent_complete,
-        "total_days_logged": total_days_logged,
-        "projected_completion": projected_completion,
-        # Pace
-        "total_avg": total_avg,
-        "days_left": days_left,
-        "weeks_left": weeks_left,
-        "expected_hours_by_now": expected_hours_by_now,
-        "hours_ahead_behind": hours_ahead_behind,
-        "pace_status": pace_status,
-        "required_avg_going_forward": required_avg_going_forward,
-        # Monthly
-        "hours_this_month": hours_this_month,
-        "hours_required_this_month": hours_required_this_month,
-        "hours_remaining_this_month": hours_remaining_this_month,
-        "percent_complete_this_month": percent_complete_this_month,
-        "days_attended_this_month": days_attended_this_month,
-        "workdays_remaining_in_month": workdays_remaining_in_month,
-        "projected_hours_end_of_month": projected_hours_end_of_month,
+
+@login_required
+@condition_on_internship(year_version)
+def get_year_summary(request):
+    """
+    Monthly totals for one year as parallel columns, January first
+    """
+    internship = internship_or_404(request)
+    year = parse_year(request.GET)
+    totals = month_totals([internship.pk], date(year, 1, 1), date(year, 12, 1))
+
+    columns = {
+        "hours": [],
+        "days_attended": [],
+        "holidays": [],
+        "weekends": [],
+        "absences": [],
     }
+    for month in range(1, 13):
+        values = totals.get((internship.pk, date(year, month, 1)), EMPTY_MONTH)
+        for column, value in zip(columns.values(), values):
+            column.append(value)
+    return JsonResponse({"year": year, **columns})
 
 
-def build_months_rows(records_map, year):
+def parse_record_date(params):
     """
-    Returns list of months with daily records for template rendering
+    Returns the date named by day/month/year params, or None if invalid
     """
-    months_rows = []
-    for month_num in range(1, 13):
-        _, last_day = monthrange(year, month_num)
-        rows = []
-        for day in range(1, last_day + 1):
-            record = records_map.get((month_num, day))
-            rows.append(
-                {
-                    "day": day,
-                    "month_num": month_num,
-                    "year": year,
-                    "am_in": record.am_in if record else None,
-                    "am_out": record.am_out if record else None,
-                    "pm_in": record.pm_in if record else None,
-                    "pm_out": record.pm_out if record else None,
-                    "hours": record.total_hours if record else None,
-                    "is_holiday": record.is_holiday if record else False,
-                    "is_weekend": record.is_weekend if record else False,
-                    "is_absent": record.is_absent if record else False,  # ADD THIS
-                }
-            )
-        months_rows.append(
-            {
-                "month": date(year, month_num, 1).strftime("%B"),
-                "month_num": month_num,
-                "year": year,
-                "rows": rows,
-            }
+    try:
+        return date(
+            int(params.get("year")), int(params.get("month")), int(params.get("day"))
         )
-    return months_rows
+    except (TypeError, ValueError):
+        return None
 
 
-def get_daily_records(internship, year):
-    daily_records = DailyTimeRecord.objects.filter(
-        internship=internship, date__year=year
-    )
-    return {(r.date.month, r.date.day): r for r in daily_records}
+def daily_record_payload(record_date, record, shared_holiday=False):
+    return {
+        "day": record_date.day,
+        "month": record_date.month,
+        "year": record_date.year,
+        "am_in": record.am_in.strftime("%H:%M") if record and record.am_in else "",
+        "am_out": (
+            record.am_out.strftime("%H:%M") if record and record.am_out else ""
+        ),
+        "pm_in": record.pm_in.strftime("%H:%M") if record and record.pm_in else "",
+        "pm_out": (
+            record.pm_out.strftime("%H:%M") if record and record.pm_out else ""
+        ),
+        "is_holiday": record.is_holiday if record else shared_holiday,
+        "is_weekend": record.is_weekend if record else False,
+        "is_absent": record.is_absent if record else False,
+    }
+
+
+def record_version(request):
+    record_date = parse_record_date(request.GET)
+    return record_date and record_date.isoformat()
 
 
 @login_required
+@condition_on_internship(record_version)
 def get_daily_record(request):
-    try:
-        day = int(request.GET.get("day"))
-        month = int(request.GET.get("month"))
-        year = int(request.GET.get("year"))
-    except (TypeError, ValueError):
+    record_date = parse_record_date(request.GET)
+    if record_date is None:
         return JsonResponse({"error": "Invalid date"}, status=400)
 
-    internship = get_object_or_404(Internship, user=request.user)
-    record_date = date(year, month, day)
+    internship = internship_or_404(request)
     record = DailyTimeRecord.objects.filter(
         internship=internship, date=record_date
     ).first()
+    shared = record is None and holiday_calendar.is_holiday(
+        internship.company_name, record_date
+    )
+    return JsonResponse(daily_record_payload(record_date, record, shared))
+
+
+@login_required
+@condition_on_internship(record_version)
+async def aget_daily_record(request):
+    record_date = parse_record_date(request.GET)
+    if record_date is None:
+        return JsonResponse({"error": "Invalid date"}, status=400)
+
+    internship = await ainternship_or_404(request)
+    record = await DailyTimeRecord.objects.filter(
+        internship=internship, date=record_date
+    ).afirst()
+    shared = record is None and await sync_to_async(holiday_calendar.is_holiday)(
+        internship.company_name, record_date
+    )
+    return JsonResponse(daily_record_payload(record_date, record, shared))
+
+
+def sync_version(request):
+    try:
+        since = parse_cursor(request.GET.get("since"))
+    except ValueError:
+        return None
+    # An unsettled cursor moves with the clock, so it is never a 304.
+    now = timezone.now()
+    internship = get_user_internship(request.user)
+    if internship is None or sync_cursor(internship, now) != internship.updated_at:
+        return None
+    return f"{since and since.timestamp()}-{needs_full_sync(since, now)}-{timezone.localdate().isoformat()}"
 
+
+@login_required
+@condition_on_internship(sync_version)
+def sync_records(request):
+    """
+    Records changed or deleted since the `since` cursor, plus the current
+    stats and the cursor for the next poll. Without a cursor (or with one
+    older than the tombstone window) every record is sent with full=true.
+    """
+    try:
+        since = parse_cursor(request.GET.get("since"))
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+    internship = internship_or_404(request)
+    now = timezone.now()
+    full, records, deleted = changes_since(internship, since, now)
+    stats = get_cached_stats(internship, get_internship_stats, holiday_calendar.version)
     return JsonResponse(
         {
-            "day": day,
-            "month": month,
-            "year": year,
-            "am_in": record.am_in.strftime("%H:%M") if record and record.am_in else "",
-            "am_out": (
-                record.am_out.strftime("%H:%M") if record and record.am_out else ""
-            ),
-            "pm_in": record.pm_in.strftime("%H:%M") if record and record.pm_in else "",
-            "pm_out": (
-                record.pm_out.strftime("%H:%M") if record and record.pm_out else ""
-            ),
-            "is_holiday": record.is_holiday if record else False,
-            "is_weekend": record.is_weekend if record else False,
-            "is_absent": record.is_absent if record else False,  # ADD THIS
+            "cursor": format_cursor(sync_cursor(internship, now)),
+            "full": full,
+            "records": [
+                {
+                    "date": record.date.isoformat(),
+                    **daily_record_payload(record.date, record),
+                    "total_hours": record.total_hours,
+                }
+                for record in records
+            ],
+            "deleted": [day.isoformat() for day in deleted],
+            "stats": stats,
         }
     )
 
 
 def get_next_quick_log_action(internship, today_record=None):
+    today = timezone.localdate()
     if today_record is None:
         today_record = DailyTimeRecord.objects.filter(
-            internship=internship, date=timezone.localdate()
+            internship=internship, date=today
         ).first()
+    shared = holiday_calendar.is_holiday(internship.company_name, today)
+    return next_quick_log_action(today_record, shared)
 
-    if not today_record:
-        return "am_in"
-
-    if (
-        today_record.is_holiday or today_record.is_weekend or today_record.is_absent
-    ):  # ADD is_absent
-        return None
-
-    if not today_record.am_in:
-        return "am_in"
-    if not today_record.am_out:
-        return "am_out"
-    if not today_record.pm_in:
-        return "pm_in"
-    if not today_record.pm_out:
-        return "pm_out"
-
-    return None
 
+RECORD_CHANGED_MESSAGE = "This day was changed elsewhere in the meantime. Please try again."
 
 ACTION_LABELS = {
     "am_in": "Time In (AM)",
@@ -295,86 +375,27 @@ def mark_day(request):
         except (TypeError, ValueError):
             return redirect("index")
 
-        internship = get_object_or_404(Internship, user=request.user)
+        internship = internship_or_404(request)
         mark_type = request.POST.get("mark")
         record_date = date(year, month, day)
 
-        record, created = DailyTimeRecord.objects.get_or_create(
-            internship=internship, date=record_date
-        )
-
-        if mark_type == "holiday":
-            if record.is_holiday:
-                # Unmarking - delete if no time entries exist
-                if not any([record.am_in, record.am_out, record.pm_in, record.pm_out]):
-                    record.delete()
-                else:
-                    record.is_holiday = False
-                    record.save()
-                redirect_month = request.POST.get("redirect_month", month)
-                redirect_year = request.POST.get("redirect_year", year)
-                return redirect(
-                    f"{reverse('index')}?month={redirect_month}&year={redirect_year}"
-                )
-            else:
-                record.is_holiday = True
-                record.is_weekend = False
-                record.is_absent = False
-                record.am_in = None
-                record.am_out = None
-                record.pm_in = None
-                record.pm_out = None
-
-        elif mark_type == "weekend":
-            if record.is_weekend:
-                # Unmarking - delete if no time entries exist
-                if not any([record.am_in, record.am_out, record.pm_in, record.pm_out]):
-                    record.delete()
-                else:
-                    record.is_weekend = False
-                    record.save()
-                redirect_month = request.POST.get("redirect_month", month)
-                redirect_year = request.POST.get("redirect_year", year)
-                return redirect(
-                    f"{reverse('index')}?month={redirect_month}&year={redirect_year}"
+        if mark_type in MARK_ACTIONS:
+            # The shared calendar decides days the intern has no record for;
+            # a record of their own overrides it either way.
+            shared = mark_type == "holiday" and holiday_calendar.is_holiday(
+                internship.company_name, record_date
+            )
+            record = read_day(internship, record_date)
+            try:
+                write_day(
+                    internship, record_date, record, mark_values(record, mark_type, shared)
                 )
-            else:
-                record.is_weekend = True
-                record.is_holiday = False
-                record.is_absent = False
-                record.am_in = None
-                record.am_out = None
-                record.pm_in = None
-                record.pm_out = None
-
-        elif mark_type == "absent":
-            if record.is_absent:
-                # Unmarking - delete if no time entries exist
-                if not any([record.am_in, record.am_out, record.pm_in, record.pm_out]):
-                    record.delete()
-                else:
-                    record.is_absent = False
-                    record.save()
-                redirect_month = request.POST.get("redirect_month", month)
-                redirect_year = request.POST.get("redirect_year", year)
-                return redirect(
-                    f"{reverse('index')}?month={redirect_month}&year={redirect_year}"
+            except ValidationError:
+                messages.error(
+                    request, "Could not mark day due to existing invalid time entries."
                 )
-            else:
-                record.is_absent = True
-                record.is_holiday = False
-                record.is_weekend = False
-                record.am_in = None
-                record.am_out = None
-                record.pm_in = None
-                record.pm_out = None
-
-        try:
-            record.save()
-        except ValidationError:
-            messages.error(
-                request, "Could not mark day due to existing invalid time entries."
-            )
+            except RecordChanged:
+                messages.error(request, RECORD_CHANGED_MESSAGE)
 
         redirect_month = request.POST.get("redirect_month", month)
         redirect_year = request.POST.get("redirect_year", year)
@@ -396,7 +417,7 @@ def update_daily_record(request):
         except (TypeError, ValueError):
             return redirect("index")
 
-        internship = get_object_or_404(Internship, user=request.user)
+        internship = internship_or_404(request)
 
         def str_to_time(s):
             if not s:
@@ -411,26 +432,26 @@ def update_daily_record(request):
         record_date = date(year, month, day)
         all_empty = all(f is None for f in [am_in, am_out, pm_in, pm_out])
 
-        record = DailyTimeRecord.objects.filter(
-            internship=internship, date=record_date
-        ).first()
+        record = read_day(internship, record_date)
 
-        if all_empty:
-            if record and not record.is_weekend and not record.is_holiday and not record.is_absent:
-                record.delete()
-        else:
-            if not record:
-                record = DailyTimeRecord(internship=internship, date=record_date)
-            record.am_in = am_in
-            record.am_out = am_out
-            record.pm_in = pm_in
-            record.pm_out = pm_out
-            try:
-                record.save()
-            except ValidationError:
-                messages.error(
-                    request, "Invalid time entries. Please check the time order."
-                )
+        try:
+            if all_empty:
+                if record and not record.is_weekend and not record.is_holiday and not record.is_absent:
+                    write_day(internship, record_date, record, None)
+            else:
+                values = record_values(record) | {
+                    "am_in": am_in,
+                    "am_out": am_out,
+                    "pm_in": pm_in,
+                    "pm_out": pm_out,
+                }
+                write_day(internship, record_date, record, values)
+        except ValidationError:
+            messages.error(
+                request, "Invalid time entries. Please check the time order."
+            )
+        except RecordChanged:
+            messages.error(request, RECORD_CHANGED_MESSAGE)
 
         return redirect(f"{reverse('index')}?month={month}&year={year}")
 
@@ -447,69 +468,192 @@ def delete_daily_record(request):
         except (TypeError, ValueError):
             return redirect("index")
 
-        internship = get_object_or_404(Internship, user=request.user)
+        internship = internship_or_404(request)
         record_date = date(year, month, day)
-        record = DailyTimeRecord.objects.filter(
-            internship=internship, date=record_date
-        ).first()
-        if record:
-            record.delete()
+        try:
+            write_day(internship, record_date, read_day(internship, record_date), None)
+        except RecordChanged:
+            messages.error(request, RECORD_CHANGED_MESSAGE)
 
         return redirect(f"{reverse('index')}?month={month}&year={year}")
 
     return redirect("index")
 
 
+MAX_BATCH_OPERATIONS = 100
+
+
+@login_required
+def batch_update_daily_records(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a JSON list of operations."}, status=405)
+
+    try:
+        operations = json.loads(request.body)["operations"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    if (
+        not isinstance(operations, list)
+        or not all(isinstance(op, dict) for op in operations)
+        or len(operations) > MAX_BATCH_OPERATIONS
+    ):
+        return JsonResponse(
+            {"error": f"Expected up to {MAX_BATCH_OPERATIONS} operation objects."},
+            status=400,
+        )
+
+    internship = internship_or_404(request)
+    results = apply_day_operations(internship, operations)
+    return JsonResponse({"results": results})
+
+
 @login_required
 def quick_log(request):
     if request.method == "POST":
-        action = request.POST.get("log_action")
-        internship = Internship.objects.get(user=request.user)
+        internship = internship_or_404(request)
+        error = log_punch(internship, request.POST.get("log_action"), timezone.localtime())
+        if error:
+            messages.error(request, error)
 
-        now = timezone.localtime()
-        date_obj = now.date()
-        time_obj = now.time()
+    return redirect("index")
 
-        # Single DB query reused for both checks
-        existing = DailyTimeRecord.objects.filter(
-            internship=internship, date=date_obj
-        ).first()
 
-        expected_action = get_next_quick_log_action(internship, existing)
-        if action != expected_action or expected_action is None:
-            messages.error(request, "Invalid log action.")
-            return redirect("index")
+@login_required
+async def aquick_log(request):
+    if request.method == "POST":
+        internship = await ainternship_or_404(request)
+        # The write runs in a transaction, which needs a sync thread.
+        error = await sync_to_async(log_punch)(
+            internship, request.POST.get("log_action"), timezone.localtime()
+        )
+        if error:
+            messages.error(request, error)
 
-        if existing and (
-            existing.is_holiday or existing.is_weekend or existing.is_absent
-        ):  # ADD is_absent
-            messages.error(
-                request, "Cannot log time on a holiday, weekend, or absent day."
-            )
-            return redirect("index")
+    return redirect("index")
+
+
+MAX_PUNCHES = 100
+
+
+@login_required
+def ingest_punches(request):
+    """
+    Applies a batch of queued quick-log punches (see apply_punches) and
+    returns each punch's result, the touched days and today's next action.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a JSON list of punches."}, status=405)
 
-        record, created = DailyTimeRecord.objects.get_or_create(
-            internship=internship, date=date_obj
+    try:
+        punches = json.loads(request.body)["punches"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    if (
+        not isinstance(punches, list)
+        or not all(isinstance(punch, dict) for punch in punches)
+        or len(punches) > MAX_PUNCHES
+    ):
+        return JsonResponse(
+            {"error": f"Expected up to {MAX_PUNCHES} punch objects."}, status=400
         )
 
-        try:
-            setattr(record, action, time_obj)
-            record.save()
-        except ValidationError:
-            messages.error(request, "Invalid log action.")
+    internship = internship_or_404(request)
+    results, records = apply_punches(internship, punches)
+    next_action = get_next_quick_log_action(
+        internship, records.get(timezone.localdate())
+    )
+    return JsonResponse(
+        {
+            "results": results,
+            "days": [
+                daily_record_payload(day, record) for day, record in sorted(records.items())
+            ],
+            "next_action": next_action,
+            "next_action_label": ACTION_LABELS.get(next_action, "No more actions for today"),
+        }
+    )
 
-    return redirect("index")
+
+@login_required
+def import_daily_records(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a CSV file as 'file'."}, status=405)
+
+    upload = request.FILES.get("file")
+    if not upload:
+        return JsonResponse({"error": "No file uploaded."}, status=400)
+
+    # Staff may load a whole cohort through the username column; everyone
+    # else imports into their own internship.
+    internship = None
+    if not request.user.is_staff:
+        internship = internship_or_404(request)
+
+    lines = (line.decode("utf-8-sig") for line in upload)
+    try:
+        imported, errors = import_records(lines, internship=internship)
+    except (UnicodeDecodeError, ValueError, csv.Error) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {
+            "imported": imported,
+            "errors": [{"line": line, "error": error} for line, error in errors],
+        }
+    )
 
 
 @login_required
-def index(request):
-    internship = get_object_or_404(Internship, user=request.user)
-    stats = get_internship_stats(internship)
+def export_daily_records(request):
+    try:
+        if request.GET.get("month"):
+            start, end = month_bounds(
+                int(request.GET.get("year")), int(request.GET.get("month"))
+            )
+        else:
+            start = request.GET.get("start") or None
+            end = request.GET.get("end") or None
+            start = date.fromisoformat(start) if start else None
+            end = date.fromisoformat(end) if end else None
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid date"}, status=400)
 
-    # Current month and year
-    current_month = int(request.GET.get("month", date.today().month))
-    current_year = int(request.GET.get("year", date.today().year))
+    # Staff can export a whole cohort or any intern; others only themselves.
+    if request.user.is_staff:
+        scope = {
+            "company": request.GET.get("company"),
+            "username": request.GET.get("username"),
+        }
+    else:
+        scope = {"internship": internship_or_404(request)}
+
+    if request.GET.get("summary"):
+        lines = summary_lines(export_internships(**scope), start, end)
+        filename = "monthly-summary.csv"
+    else:
+        lines = export_lines(export_queryset(**scope, start=start, end=end))
+        filename = "daily-time-records.csv"
+
+    response = StreamingHttpResponse(lines, content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
+
+def shared_holiday_context(internship, current_month, current_year, today):
+    """
+    Returns (version, shared holiday days of the shown month, whether today is
+    a shared holiday) from the in-process holiday calendar
+    """
+    return (
+        holiday_calendar.version,
+        month_holiday_days(internship, current_year, current_month),
+        holiday_calendar.is_holiday(internship.company_name, today),
+    )
+
+
+def build_calendar_context(records_map, current_month, current_year, holiday_days=()):
     # Prev/Next month with year rollover
     if current_month == 1:
         prev_month = 12
@@ -525,38 +669,316 @@ def index(request):
         next_month = current_month + 1
         next_year = current_year
 
-    # Build daily records
-    records_map = get_daily_records(internship, current_year)
-    months_rows = build_months_rows(records_map, current_year)
+    return {
+        "month_rows": build_month_rows(records_map, current_year, current_month, holiday_days),
+        "current_month": current_month,
+        "current_year": current_year,
+        "prev_month": prev_month,
+        "prev_year": prev_year,
+        "next_month": next_month,
+        "next_year": next_year,
+    }
 
-    today = timezone.localdate()
-    today_record = DailyTimeRecord.objects.filter(
-        internship=internship, date=today
-    ).first()
-    next_action = get_next_quick_log_action(internship, today_record)
+
+def build_index_context(
+    internship,
+    stats,
+    current_month,
+    current_year,
+    today,
+    today_record,
+    today_shared_holiday=False,
+    fragments=None,
+):
+    today_shared_holiday = today_record is None and today_shared_holiday
+    next_action = next_quick_log_action(today_record, today_shared_holiday)
     next_action_label = ACTION_LABELS.get(next_action, "No more actions for today")
 
     context = {
         "internship": internship,
         **stats,
-        "months_rows": months_rows,
+        **(fragments or {}),
         "current_month": current_month,
         "current_year": current_year,
-        "prev_month": prev_month,
-        "prev_year": prev_year,
-        "next_month": next_month,
-        "next_year": next_year,
         "next_action": next_action,
         "next_action_label": next_action_label,
         "today_quick_log": today,
-        "today_is_holiday": today_record.is_holiday if today_record else False,
+        "today_is_holiday": (
+            today_record.is_holiday if today_record else today_shared_holiday
+        ),
         "today_is_weekend": today_record.is_weekend if today_record else False,
         "today_is_absent": today_record.is_absent if today_record else False,
     }
+    return context
+
+
+# Part of the dashboard ETag; bump it when the page markup changes so
+# browsers don't keep revalidating an old copy.
+DASHBOARD_VERSION = 2
+
+
+def dashboard_version(request):
+    # Flash messages are shown once, so a page carrying them is never a 304.
+    if len(messages.get_messages(request)):
+        return None
+    month, year = parse_month(request.GET)
+    # The page embeds a CSRF token, so a rotated token (e.g. after logging
+    # in again) needs a fresh render.
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    return f"{year}-{month}-{timezone.localdate().isoformat()}-{DASHBOARD_VERSION}-{csrf_secret}"
+
+
+def calendar_fragment_key(internship, month, data_version, holidays_version):
+    return fragment_cache_key(
+        "calendar", internship.pk, month, data_version, holidays_version, DASHBOARD_VERSION
+    )
+
 
+def stats_fragment_key(internship, today, holidays_version):
+    # updated_at moves with every record write, like the dashboard ETag.
+    return fragment_cache_key(
+        "stats",
+        internship.pk,
+        internship.updated_at.timestamp(),
+        today,
+        holidays_version,
+        DASHBOARD_VERSION,
+    )
+
+
+@login_required
+@condition_on_internship(dashboard_version)
+def index(request):
+    internship = internship_or_404(request)
+
+    # Current month and year
+    current_month, current_year = parse_month(request.GET)
+    month = date(current_year, current_month, 1)
+    today = timezone.localdate()
+    holidays_version, holiday_days, today_shared = shared_holiday_context(
+        internship, current_month, current_year, today
+    )
+    stats = get_cached_stats(internship, get_internship_stats, holidays_version)
+
+    # The month table is rendered from the visible month's records only when
+    # its data version has no cached copy; other months load as JSON.
+    records_map = None
+    data_version = month_data_version(internship.pk, month)
+
+    def render_calendar():
+        nonlocal records_map
+        records_map = get_daily_records(internship, current_year, current_month)
+        return render_to_string(
+            "partials/log-calendar.html",
+            build_calendar_context(records_map, current_month, current_year, holiday_days),
+        )
+
+    fragments = {
+        "calendar_html": get_cached_fragment(
+            calendar_fragment_counter,
+            calendar_fragment_key(internship, month, data_version, holidays_version),
+            render_calendar,
+        ),
+        "stats_html": get_cached_fragment(
+            stats_fragment_counter,
+            stats_fragment_key(internship, today, holidays_version),
+            lambda: render_to_string("partials/stats-modal.html", stats),
+        ),
+    }
+
+    if records_map is not None and (today.year, today.month) == (current_year, current_month):
+        today_record = records_map.get(today.day)
+    else:
+        today_record = DailyTimeRecord.objects.filter(
+            internship=internship, date=today
+        ).first()
+
+    context = build_index_context(
+        internship,
+        stats,
+        current_month,
+        current_year,
+        today,
+        today_record,
+        today_shared,
+        fragments,
+    )
     return render(request, "pages/index.html", context)
 
 
+@login_required
+@condition_on_internship(dashboard_version)
+async def aindex(request):
+    internship = await ainternship_or_404(request)
+    current_month, current_year = parse_month(request.GET)
+    month = date(current_year, current_month, 1)
+    today = timezone.localdate()
+    holidays_version, holiday_days, today_shared = await sync_to_async(
+        shared_holiday_context
+    )(internship, current_month, current_year, today)
+    stats = await aget_cached_stats(internship, aget_internship_stats, holidays_version)
+
+    records_map = None
+    data_version = await amonth_data_version(internship.pk, month)
+
+    async def render_calendar():
+        nonlocal records_map
+        records_map = await aget_daily_records(internship, current_year, current_month)
+        return await sync_to_async(render_to_string)(
+            "partials/log-calendar.html",
+            build_calendar_context(records_map, current_month, current_year, holiday_days),
+        )
+
+    fragments = {
+        "calendar_html": await aget_cached_fragment(
+            calendar_fragment_counter,
+            calendar_fragment_key(internship, month, data_version, holidays_version),
+            render_calendar,
+        ),
+        "stats_html": await aget_cached_fragment(
+            stats_fragment_counter,
+            stats_fragment_key(internship, today, holidays_version),
+            lambda: sync_to_async(render_to_string)("partials/stats-modal.html", stats),
+        ),
+    }
+
+    if records_map is not None and (today.year, today.month) == (current_year, current_month):
+        today_record = records_map.get(today.day)
+    else:
+        today_record = await DailyTimeRecord.objects.filter(
+            internship=internship, date=today
+        ).afirst()
+
+    context = build_index_context(
+        internship,
+        stats,
+        current_month,
+        current_year,
+        today,
+        today_record,
+        today_shared,
+        fragments,
+    )
+    # Context processors and the template still touch request.user lazily,
+    # which the ORM only allows from a sync thread.
+    return await sync_to_async(render)(request, "pages/index.html", context)
+
+
+@staff_member_required
+def metrics_report(request):
+    if request.method == "POST" and request.POST.get("reset"):
+        metrics_registry.reset()
+        return redirect("metrics")
+
+    snapshot = metrics_registry.snapshot()
+    snapshot["caches"] = cache_counters()
+
+    if request.GET.get("format") == "json":
+        return JsonResponse(snapshot)
+
+    context = {
+        **snapshot,
+        "views": sorted(
+            snapshot["views"].items(), key=lambda item: -item[1]["wall_ms"]["p95"]
+        ),
+        "since": datetime.fromtimestamp(snapshot["since"], tz=timezone.get_current_timezone()),
+        "metrics_enabled": settings.METRICS_ENABLED,
+        "query_budget": settings.METRICS_QUERY_BUDGET,
+    }
+    return render(request, "pages/metrics.html", context)
+
+
+COHORT_PAGE_SIZE = 100
+
+# Stats shown per intern on the cohort page and in its JSON.
+COHORT_STATS = (
+    "total_logged",
+    "total_required",
+    "percent_complete",
+    "expected_hours_by_now",
+    "hours_ahead_behind",
+    "pace_status",
+    "days_left",
+    "projected_completion",
+    "required_avg_going_forward",
+    "hours_this_month",
+)
+
+COHORT_SORTS = {
+    # Furthest behind first.
+    "pace": lambda pair: pair[1]["hours_ahead_behind"],
+    "name": lambda pair: pair[0].username,
+    "progress": lambda pair: -pair[1]["percent_complete"],
+    "completion": lambda pair: pair[1]["projected_completion"],
+}
+
+
+def cohort_row(member, stats):
+    row = {
+        "username": member.username,
+        "name": f"{member.first_name} {member.last_name}".strip(),
+        "start_date": member.start_date,
+        **{key: stats[key] for key in COHORT_STATS},
+    }
+    row["percent_complete"] = round(row["percent_complete"], 1)
+    return row
+
+
+def cohort_summary(cohort):
+    pace = Counter(stats["pace_status"] for _, stats in cohort)
+    return {
+        "interns": len(cohort),
+        "ahead": pace["Ahead"],
+        "on_track": pace["On Track"],
+        "behind": pace["Behind"],
+        "percent_complete": (
+            round(sum(stats["percent_complete"] for _, stats in cohort) / len(cohort), 1)
+            if cohort
+            else 0
+        ),
+    }
+
+
+@staff_member_required
+def cohort_report(request):
+    # One entry per company as company_key() sees it, so "Acme" and "acme "
+    # do not split a cohort in two.
+    names = {}
+    for name in (
+        Internship.objects.order_by("company_name")
+        .values_list("company_name", flat=True)
+        .distinct()
+    ):
+        names.setdefault(company_key(name), name.strip())
+    companies = sorted(names.values())
+    company = request.GET.get("company") or (companies[0] if companies else "")
+    sort = request.GET.get("sort")
+    if sort not in COHORT_SORTS:
+        sort = "pace"
+
+    today = timezone.localdate()
+    # The whole cohort is computed either way: the summary and the sort
+    # orders need every intern, and the stats come from two queries.
+    cohort = get_cohort_stats(company, today) if company else []
+    cohort.sort(key=COHORT_SORTS[sort])
+    page = Paginator(cohort, COHORT_PAGE_SIZE).get_page(request.GET.get("page"))
+
+    data = {
+        "company": company,
+        "today": today,
+        "sort": sort,
+        "summary": cohort_summary(cohort),
+        "page": page.number,
+        "num_pages": page.paginator.num_pages,
+        "interns": [cohort_row(*pair) for pair in page],
+    }
+    if request.GET.get("format") == "json":
+        return JsonResponse(data)
+
+    context = {**data, "page_obj": page, "companies": companies, "sorts": COHORT_SORTS}
+    return render(request, "pages/cohort.html", context)
+
+
 def auth(request):
     if request.user.is_authenticated:
         return redirect("index")
@@ -598,7 +1020,7 @@ def register_view(request):
         last_name = request.POST.get("last_name")
         password1 = request.POST.get("password1")
         password2 = request.POST.get("password2")
-        company_name = request.POST.get("company_name")
+        company_name = (request.POST.get("company_name") or "").strip()
         supervisor_name = request.POST.get("supervisor_name")
         start_date = request.POST.get("start_date")
         total_hours_required = request.POST.get("total_hours_required")
@@ -634,7 +1056,7 @@ def register_view(request):
             total_hours_required=total_hours_required,
         )
 
-        login(request, user)
+        login(request, user, backend="Main.backends.InternshipBackend")
         return redirect("index")
 
     return redirect("auth")
@@ -644,7 +1066,7 @@ def register_view(request):
 def update_user_info(request):
     if request.method == "POST":
         user = request.user
-        internship = get_object_or_404(Internship, user=user)
+        internship = internship_or_404(request)
 
         # Get form data
         username = request.POST.get("username").strip()
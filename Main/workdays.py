@@ -0,0 +1,77 @@
+from bisect import bisect_left
+from datetime import timedelta
+
+# Interns work a 4-day week: Monday to Thursday.
+WORKDAYS_PER_WEEK = 4
+
+
+class WorkdayCalendar:
+    """
+    Working-day arithmetic over a Monday-first week of `workdays_per_week`
+    days minus a set of holidays, in O(log holidays) instead of day loops.
+    """
+
+    def __init__(self, holidays=(), workdays_per_week=WORKDAYS_PER_WEEK):
+        self.workdays_per_week = workdays_per_week
+        # Only holidays that land on a working weekday change any count.
+        self.holidays = sorted(
+            d for d in set(holidays) if d.weekday() < workdays_per_week
+        )
+
+    def is_working_day(self, d):
+        if d.weekday() >= self.workdays_per_week:
+            return False
+        i = bisect_left(self.holidays, d)
+        return i == len(self.holidays) or self.holidays[i] != d
+
+    def _weekdays_between(self, start, end):
+        # Working weekdays in [start, end), ignoring holidays.
+        days = (end - start).days
+        if days <= 0:
+            return 0
+        weeks, rest = divmod(days, 7)
+        first = start.weekday()
+        return weeks * self.workdays_per_week + sum(
+            1 for i in range(rest) if (first + i) % 7 < self.workdays_per_week
+        )
+
+    def _holidays_between(self, start, end):
+        # Working-weekday holidays in [start, end).
+        return bisect_left(self.holidays, end) - bisect_left(self.holidays, start)
+
+    def count(self, start, end):
+        """
+        Number of working days d with start <= d < end.
+        """
+        if end <= start:
+            return 0
+        return self._weekdays_between(start, end) - self._holidays_between(start, end)
+
+    def _add_weekdays(self, start, n):
+        # The n-th working weekday strictly after start, ignoring holidays.
+        weeks = (n - 1) // self.workdays_per_week
+        current = start + timedelta(weeks=weeks)
+        n -= weeks * self.workdays_per_week
+        while n:
+            current += timedelta(days=1)
+            if current.weekday() < self.workdays_per_week:
+                n -= 1
+        return current
+
+    def add(self, start, n):
+        """
+        The n-th working day strictly after start (start itself if n <= 0).
+        """
+        if n <= 0:
+            return start
+
+        current = self._add_weekdays(start, n)
+        # Each holiday jumped over pushes the target one working day further.
+        skipped = self._holidays_between(start + timedelta(days=1), current + timedelta(days=1))
+        while skipped:
+            following = self._add_weekdays(current, skipped)
+            skipped = self._holidays_between(
+                current + timedelta(days=1), following + timedelta(days=1)
+            )
+            current = following
+        return current